@@ -1,6 +1,8 @@
 #! /usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import sys
+
 from .wrapper import (
     array,
     zeros,
@@ -11,16 +13,43 @@ from .wrapper import (
     ones_like,
     full_like,
     fromfile,
+    fromfiles,
+    info,
     fromdataset,
+    iterblocks,
+    writeblocks,
+)
+
+from .core import (
+    setCheckMatch,
 )
 
 from .gdalfuncs import (
     resample,
     project,
     rescale,
+    upsample,
+    combine,
+    WarpPlan,
+)
+
+from .gdaltrans import (
+    transform,
+)
+
+from .catalog import (
+    RasterCatalog,
 )
 
 from .gdalio import (
     _DRIVER_DICT,
+    setPoolSize,
     # fromfile,
 )
+
+if sys.version_info >= (3, 6):
+    from .aio import (
+        afromfile,
+        aiterblocks,
+        setAsyncWorkers,
+    )
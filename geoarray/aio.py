@@ -0,0 +1,171 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Purpose
+-------
+This module provides asyncio counterparts of the file I/O functions.
+All GDAL calls are offloaded to a bounded thread pool. At most as many
+calls as there are worker threads are submitted at once, all others
+wait within the event loop. Python >= 3.6 only.
+"""
+
+import asyncio
+import functools
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from .wrapper import array, fromfile
+from .gdalio import _iterBlocks
+
+# Default number of worker threads, see setAsyncWorkers
+_MAX_WORKERS = 4
+
+_EXECUTOR = None
+_SEMAPHORES = weakref.WeakKeyDictionary()
+_EXECUTOR_LOCK = threading.Lock()
+
+# Marks the end of a block iteration within the executor
+_DONE = object()
+
+
+def setAsyncWorkers(value):
+    """
+    Arguments
+    ---------
+    value : int
+
+    Returns
+    -------
+    int
+
+    Purpose
+    -------
+    Set the number of worker threads used by the asyncio functions, i.e. the
+    maximum number of concurrent GDAL calls. Calls already submitted finish
+    on the previous pool. Returns the previous setting.
+    """
+
+    global _MAX_WORKERS, _EXECUTOR
+    with _EXECUTOR_LOCK:
+        out, _MAX_WORKERS = _MAX_WORKERS, int(value)
+        if _EXECUTOR is not None:
+            _EXECUTOR.shutdown(wait=False)
+        _EXECUTOR = None
+        _SEMAPHORES.clear()
+    return out
+
+
+def _executor():
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=_MAX_WORKERS)
+        return _EXECUTOR
+
+
+def _semaphore(loop):
+    # asyncio primitives are bound to an event loop
+    with _EXECUTOR_LOCK:
+        if loop not in _SEMAPHORES:
+            _SEMAPHORES[loop] = asyncio.Semaphore(_MAX_WORKERS)
+        return _SEMAPHORES[loop]
+
+
+async def _run(func, *args, **kwargs):
+    """
+    Run func in the executor, once a worker is available. Cancelling
+    the returned coroutine cancels calls not yet started, running
+    GDAL calls can not be interrupted.
+    """
+
+    loop = asyncio.get_event_loop()
+    async with _semaphore(loop):
+        return await loop.run_in_executor(
+            _executor(), functools.partial(func, *args, **kwargs)
+        )
+
+
+async def afromfile(fname, lazy_mask=False, bbox=None, window=None, bands=None,
+                    cellsize=None, scale=None, mode="r"):
+    """
+    Arguments
+    ---------
+    see wrapper.fromfile
+
+    Returns
+    -------
+    GeoArray
+
+    Purpose
+    -------
+    Asynchronous version of wrapper.fromfile
+    """
+
+    return await _run(
+        fromfile, fname, lazy_mask=lazy_mask, bbox=bbox, window=window,
+        bands=bands, cellsize=cellsize, scale=scale, mode=mode
+    )
+
+
+async def atofile(grid, fname, **kwargs):
+    """
+    Arguments
+    ---------
+    grid  : GeoArray
+    fname : str       # file name
+
+    Optional Arguments
+    ------------------
+    see GeoArray.tofile
+
+    Returns
+    -------
+    None
+
+    Purpose
+    -------
+    Asynchronous version of GeoArray.tofile
+    """
+
+    return await _run(grid.tofile, fname, **kwargs)
+
+
+async def aiterblocks(fname, halo=0, bands=None, lazy_mask=False):
+    """
+    Arguments
+    ---------
+    see wrapper.iterblocks
+
+    Returns
+    -------
+    async generator of GeoArray
+
+    Purpose
+    -------
+    Asynchronous version of wrapper.iterblocks. The next block is read
+    while the current one is processed, i.e. at most two blocks are
+    held in memory.
+    """
+
+    # the generator is advanced by any of the worker threads, a pooled
+    # handle would be shared with the other calls of the first thread
+    blocks = _iterBlocks(fname, halo=halo, bands=bands, pooled=False)
+
+    def _next():
+        # StopIteration can not be passed through a future
+        return next(blocks, _DONE)
+
+    pending = asyncio.ensure_future(_run(_next))
+    try:
+        while True:
+            item = await pending
+            if item is _DONE:
+                return
+            pending = asyncio.ensure_future(_run(_next))
+            args, halo_widths = item
+            block = array(lazy_mask=lazy_mask, **args)
+            block._optinfo["halo"] = halo_widths
+            yield block
+    finally:
+        pending.cancel()
@@ -0,0 +1,379 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Purpose
+-------
+This module provides a spatial index over many raster files
+"""
+
+import os
+import json
+import warnings
+import numpy as np
+from math import floor, ceil
+from .core import GeoInfo
+from .gdalio import _DATASETS, _readWindow
+from .wrapper import array, info, ThreadPoolExecutor
+
+# Files spanning more index buckets are not assigned to the buckets,
+# but checked on every query
+_MAXBUCKETS = 1024
+
+# Tolerance of the snapping of coordinates to cell boundaries (in cells)
+_EPS = 1e-6
+
+
+def _round(value):
+    # round half up, independent of the Python version
+    return int(floor(value + .5))
+
+
+def _intersects(a, b):
+    return (
+        a["xmin"] < b["xmax"] and a["xmax"] > b["xmin"]
+        and a["ymin"] < b["ymax"] and a["ymax"] > b["ymin"]
+    )
+
+
+class RasterCatalog(object):
+    def __init__(self, fnames=(), bucketsize=None, max_workers=4):
+        """
+        Arguments
+        ---------
+        None
+
+        Optional Arguments
+        ------------------
+        fnames      : iterable of str  # files to index
+        bucketsize  : scalar           # edge length of the index buckets in map units,
+                                       # defaults to the extent of the first indexed file,
+                                       # or its cellsize if the extent is empty
+        max_workers : int              # number of threads reading the file headers
+
+        Purpose
+        -------
+        Index raster files by their bounding boxes. The files are assigned
+        to all buckets of a regular grid they intersect, queries only check
+        the files within the buckets intersecting the query bbox. The index
+        is built from header-only reads (see wrapper.info) and can be saved
+        to/loaded from a JSON file. All files are expected to share the
+        same projection.
+        """
+
+        if bucketsize is not None and not bucketsize > 0:
+            raise ValueError("Argument 'bucketsize' must be positive")
+        self.bucketsize = bucketsize
+        self._infos = []
+        self._buckets = {}
+        # files not assigned to buckets, see _MAXBUCKETS
+        self._large = []
+        # inclusive (rowmin, rowmax, colmin, colmax) range of the bucket keys
+        self._extent = None
+        self.extend(fnames, max_workers=max_workers)
+
+    def __len__(self):
+        return len(self._infos)
+
+    def __iter__(self):
+        return iter(self._infos)
+
+    def _keyRange(self, bbox):
+        # inclusive (row, col) ranges of the buckets intersecting bbox
+        size = float(self.bucketsize)
+        return (
+            (int(floor(bbox["ymin"]/size)), int(floor(bbox["ymax"]/size))),
+            (int(floor(bbox["xmin"]/size)), int(floor(bbox["xmax"]/size))),
+        )
+
+    def _insert(self, geoinfo):
+        bbox = geoinfo.bbox
+        if self.bucketsize is None:
+            self.bucketsize = (
+                max(bbox["ymax"] - bbox["ymin"], bbox["xmax"] - bbox["xmin"])
+                or max(abs(c) for c in geoinfo.cellsize)
+            )
+            if not self.bucketsize > 0:
+                self.bucketsize = None
+                raise ValueError("Unable to derive a bucket size, the file has neither an extent nor a cellsize")
+        idx = len(self._infos)
+        self._infos.append(geoinfo)
+
+        (rowmin, rowmax), (colmin, colmax) = self._keyRange(bbox)
+        if (rowmax - rowmin + 1) * (colmax - colmin + 1) > _MAXBUCKETS:
+            self._large.append(idx)
+            return
+        for row in range(rowmin, rowmax + 1):
+            for col in range(colmin, colmax + 1):
+                self._buckets.setdefault((row, col), []).append(idx)
+
+        if self._extent is None:
+            self._extent = [rowmin, rowmax, colmin, colmax]
+        else:
+            extent = self._extent
+            extent[:] = (
+                min(extent[0], rowmin), max(extent[1], rowmax),
+                min(extent[2], colmin), max(extent[3], colmax),
+            )
+
+    def add(self, fname):
+        """
+        Arguments
+        ---------
+        fname : str  # file name
+
+        Returns
+        -------
+        None
+
+        Purpose
+        -------
+        Add the given file to the index
+        """
+
+        self._insert(info(os.path.abspath(fname)))
+
+    def extend(self, fnames, max_workers=4):
+        """
+        Arguments
+        ---------
+        fnames : iterable of str  # file names
+
+        Optional Arguments
+        ------------------
+        max_workers : int  # number of threads reading the file headers
+
+        Returns
+        -------
+        None
+
+        Purpose
+        -------
+        Add the given files to the index. The headers are read concurrently
+        if concurrent.futures is available.
+        """
+
+        fnames = [os.path.abspath(f) for f in fnames]
+        if ThreadPoolExecutor is None or max_workers < 2 or len(fnames) < 2:
+            infos = [info(f) for f in fnames]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                infos = list(executor.map(info, fnames))
+        for geoinfo in infos:
+            self._insert(geoinfo)
+
+    def query(self, bbox):
+        """
+        Arguments
+        ---------
+        bbox : dict  # {"ymin", "ymax", "xmin", "xmax"}
+
+        Returns
+        -------
+        list of GeoInfo
+
+        Purpose
+        -------
+        Return the headers of all indexed files intersecting bbox, in the
+        order they were added to the index
+        """
+
+        if not self._infos:
+            return []
+
+        candidates = set(self._large)
+        if self._extent is not None:
+            # only the populated part of the key range needs to be checked
+            (rowmin, rowmax), (colmin, colmax) = self._keyRange(bbox)
+            rowmin, rowmax = max(rowmin, self._extent[0]), min(rowmax, self._extent[1])
+            colmin, colmax = max(colmin, self._extent[2]), min(colmax, self._extent[3])
+            nkeys = max(rowmax - rowmin + 1, 0) * max(colmax - colmin + 1, 0)
+            if nkeys > len(self._buckets):
+                for (row, col), idxs in self._buckets.items():
+                    if rowmin <= row <= rowmax and colmin <= col <= colmax:
+                        candidates.update(idxs)
+            else:
+                for row in range(rowmin, rowmax + 1):
+                    for col in range(colmin, colmax + 1):
+                        candidates.update(self._buckets.get((row, col), ()))
+
+        return [
+            self._infos[idx] for idx in sorted(candidates)
+            if _intersects(self._infos[idx].bbox, bbox)
+        ]
+
+    def read(self, bbox, cellsize=None, bands=None):
+        """
+        Arguments
+        ---------
+        bbox : dict  # {"ymin", "ymax", "xmin", "xmax"}
+
+        Optional Arguments
+        ------------------
+        cellsize : scalar/(scalar, scalar)  # read at the given cellsize
+        bands    : list of int              # read only the given (0-based) bands
+
+        Returns
+        -------
+        GeoArray
+
+        Purpose
+        -------
+        Read all cells intersecting bbox from the indexed files and mosaic
+        them into one grid. Only the intersecting files are opened and only
+        the windows within bbox are read. Without a cellsize, the target grid
+        is bbox snapped to the cells of the first intersecting file, all files
+        need to share its cellsize. Otherwise the target grid starts at the
+        upper left corner of bbox. Every file is read directly into the
+        target cells it covers. Cells covered by more than one file take the
+        last valid value, cells not covered by any file are masked.
+        """
+
+        infos = self.query(bbox)
+        if not infos:
+            raise ValueError("Given bbox does not intersect any of the indexed files!")
+
+        first = infos[0]
+        for i in infos[1:]:
+            if i._proj.fingerprint != first._proj.fingerprint:
+                warnings.warn("Incompatible map projections!", RuntimeWarning)
+
+        if cellsize is None:
+            ycellsize, xcellsize = (float(abs(c)) for c in first.cellsize)
+            for i in infos[1:]:
+                if not np.allclose(np.abs(i.cellsize), (ycellsize, xcellsize)):
+                    raise ValueError("Files with differing cellsizes, a cellsize needs to be given")
+            # snap bbox to the cells of the first file
+            top, left = first.bbox["ymax"], first.bbox["xmin"]
+            ymax = top - floor((top - bbox["ymax"]) / ycellsize + _EPS) * ycellsize
+            ymin = top - ceil((top - bbox["ymin"]) / ycellsize - _EPS) * ycellsize
+            xmin = left + floor((bbox["xmin"] - left) / xcellsize + _EPS) * xcellsize
+            xmax = left + ceil((bbox["xmax"] - left) / xcellsize - _EPS) * xcellsize
+        else:
+            try:
+                ycellsize, xcellsize = (float(abs(c)) for c in cellsize)
+            except TypeError:
+                ycellsize = xcellsize = float(abs(cellsize))
+            ymin, ymax, xmin, xmax = bbox["ymin"], bbox["ymax"], bbox["xmin"], bbox["xmax"]
+
+        nrows = max(int(ceil((ymax - ymin) / ycellsize - _EPS)), 1)
+        ncols = max(int(ceil((xmax - xmin) / xcellsize - _EPS)), 1)
+
+        bandidx = range(first.nbands) if bands is None else list(bands)
+        fill_values = [i.fill_value for i in infos if i.fill_value is not None]
+        fill_value = fill_values[0] if fill_values else None
+        dtype = np.result_type(*[i.dtype for i in infos])
+        shape = (len(bandidx), nrows, ncols)
+
+        data = np.full(shape, 0 if fill_value is None else fill_value, dtype=dtype)
+        mask = np.ones(shape, dtype=bool)
+        for i in infos:
+            # the target rows/cols covered by the file, the file's boundaries are
+            # snapped to the target cells, i.e. adjacent files do not overlap
+            extent = i.bbox
+            row = max(_round((ymax - extent["ymax"]) / ycellsize), 0)
+            col = max(_round((extent["xmin"] - xmin) / xcellsize), 0)
+            stoprow = min(_round((ymax - extent["ymin"]) / ycellsize), nrows)
+            stopcol = min(_round((extent["xmax"] - xmin) / xcellsize), ncols)
+            if stoprow <= row or stopcol <= col:
+                continue
+
+            # the file cells within these target cells
+            fycellsize, fxcellsize = np.abs(i.cellsize)
+            top = (extent["ymax"] - (ymax - row * ycellsize)) / fycellsize
+            bottom = (extent["ymax"] - (ymax - stoprow * ycellsize)) / fycellsize
+            left = ((xmin + col * xcellsize) - extent["xmin"]) / fxcellsize
+            right = ((xmin + stopcol * xcellsize) - extent["xmin"]) / fxcellsize
+            top, left = max(int(floor(top + _EPS)), 0), max(int(floor(left + _EPS)), 0)
+            bottom = min(max(int(ceil(bottom - _EPS)), top + 1), i.nrows)
+            right = min(max(int(ceil(right - _EPS)), left + 1), i.ncols)
+
+            values = _readWindow(
+                _DATASETS.open(i.fname), (top, left, bottom - top, right - left),
+                bandidx, (stoprow - row, stopcol - col)
+            )
+            if i.fill_value is None:
+                valid = np.ones(values.shape, dtype=bool)
+            else:
+                valid = values != i.fill_value
+            window = (Ellipsis, slice(row, stoprow), slice(col, stopcol))
+            data[window][valid] = values[valid]
+            mask[window] &= ~valid
+
+        if bands is None and first.ndim < 3:
+            data, mask = data[0], mask[0]
+
+        out = array(
+            data       = data,
+            yorigin    = ymax,
+            xorigin    = xmin,
+            origin     = "ul",
+            cellsize   = (-ycellsize, xcellsize),
+            fill_value = fill_value,
+            proj       = first.proj,
+            mode       = first.mode,
+        )
+        if fill_value is None and mask.any():
+            out.mask = mask
+        return out
+
+    def save(self, fname):
+        """
+        Arguments
+        ---------
+        fname : str  # file name
+
+        Returns
+        -------
+        None
+
+        Purpose
+        -------
+        Write the index to a JSON file, see RasterCatalog.load
+        """
+
+        entries = [
+            {
+                "fname"       : i.fname,
+                "shape"       : list(i.shape),
+                "dtype"       : None if i.dtype is None else str(i.dtype),
+                "yorigin"     : i.yorigin,
+                "xorigin"     : i.xorigin,
+                "origin"      : i.origin,
+                "cellsize"    : list(i.cellsize),
+                "proj"        : i.proj,
+                "fill_value"  : i.fill_value,
+                "mode"        : i.mode,
+                "fill_values" : list(i.fill_values),
+            }
+            for i in self._infos
+        ]
+        with open(fname, "w") as f:
+            json.dump({"bucketsize": self.bucketsize, "files": entries}, f)
+
+    @classmethod
+    def load(cls, fname):
+        """
+        Arguments
+        ---------
+        fname : str  # file name
+
+        Returns
+        -------
+        RasterCatalog
+
+        Purpose
+        -------
+        Read an index written by RasterCatalog.save. No raster file is
+        opened, the buckets are rebuilt from the stored headers.
+        """
+
+        with open(fname) as f:
+            content = json.load(f)
+
+        out = cls(bucketsize=content["bucketsize"])
+        for entry in content["files"]:
+            if entry["dtype"] is not None:
+                entry["dtype"] = np.dtype(entry["dtype"])
+            out._insert(GeoInfo(**entry))
+        return out
@@ -13,14 +13,20 @@ This module provides a numpy.ma.MaskedArray as a wrapper around gdal raster func
 """
 
 import os
+import sys
 import copy
 import numpy as np
 import warnings
 from numpy.ma import MaskedArray
 from math import floor, ceil
-from .utils import _broadcastedMeshgrid, _broadcastTo
+from .utils import (
+    _broadcastedMeshgrid, _broadcastTo, _normalizeIndex, _blockWindows, _indexExtent, _memoryExtent,
+)
 from .gdaltrans import _Projection
-from .gdalio import _getDataset, _toFile
+from .gdalio import (
+    _getDataset, _toFile, _toCog, _blockSize, _flushDataset, _isSource, _isFileBacked,
+    _isWriteableMapping, _mappedDataset,
+)
 
 
 # Possible positions of the grid origin
@@ -43,32 +49,147 @@ _METHODS = (
     "__floordiv__", "__mod__", "__divmod__", "__pow__", "__lshift__",
     "__rshift__", "__and__", "__or__", "__xor__", # "__matmul__",
 
+)
+
+_INPLACE_METHODS = (
     # arithmetic, in-place
     "__iadd__", "__isub__", "__imul__", "__idiv__", "__itruediv__",
     "__ifloordiv__", "__imod__", "__ipow__", "__ilshift__", "__irshift__",
     "__iand__", "__ior__", "__ixor__", # "__imatmul__",
 )
 
+# Functions modifying their first argument in-place, see GeoArray.__array_function__
+_INPLACE_FUNCTIONS = frozenset(
+    getattr(np, name) for name in
+    ("copyto", "place", "putmask", "put_along_axis", "fill_diagonal")
+    if hasattr(np, name)
+)
+
+# Possible treatments of indices/coordinates outside of the grid
+_BOUNDS = (
+    "raise", #     "raise" -> raise a ValueError
+    "mask",  #     "mask"  -> mask the respective values
+    "clip",  #     "clip"  -> clip to the grid domain
+)
+
+def _linearKernel(t):
+    return (0, 1), (1 - t, t)
+
+def _cubicKernel(t, a=-.5):
+    # Keys' cubic convolution kernel
+    def k(d):
+        d = np.abs(d)
+        return np.where(
+            d <= 1,
+            (a + 2) * d**3 - (a + 3) * d**2 + 1,
+            np.where(d < 2, a * d**3 - 5 * a * d**2 + 8 * a * d - 4 * a, 0)
+        )
+    return (-1, 0, 1, 2), (k(t + 1), k(t), k(1 - t), k(2 - t))
+
+# Point sampling methods, interpolation kernels map the distance to the
+# next lower cell center to the neighbour offsets and their weights
+_SAMPLING = {
+    "nearest"  : None,
+    "bilinear" : _linearKernel,
+    "cubic"    : _cubicKernel,
+}
+
+# Default (nrows, ncols) of the blocks of grids not backed by a dataset
+_BLOCKSIZE = (256, 256)
+
+# Placeholder for a mask, which will be computed on first access
+_LAZYMASK = object()
+
+# Global switch for the operator compatibility checks, see setCheckMatch
+_CHECK_MATCH = True
+
+def setCheckMatch(value):
+    """
+    Arguments
+    ---------
+    value : bool
+
+    Returns
+    -------
+    bool
+
+    Purpose
+    -------
+    Enable/disable the checks for matching projections, cellsizes and
+    origins of the operands of all arithmetic and comparison operators.
+    Returns the previous setting.
+    """
+
+    global _CHECK_MATCH
+    out, _CHECK_MATCH = _CHECK_MATCH, bool(value)
+    return out
+
 def _checkMatch(func):
     def inner(*args):
-        if len({a._proj.get() for a in args if isinstance(a, GeoArray)}) > 1:
-            warnings.warn("Incompatible map projections!", RuntimeWarning)
-        if len({a.cellsize for a in args if isinstance(a, GeoArray)}) != 1:
-            warnings.warn("Incompatible cellsizes", RuntimeWarning)
-        if len({a.getOrigin("ul") for a in args if isinstance(a, GeoArray)}) != 1:
-            warnings.warn("Incompatible origins", RuntimeWarning)
+        if _CHECK_MATCH:
+            signatures = {a._signature for a in args if isinstance(a, GeoArray)}
+            if len(signatures) > 1:
+                projs, cellsizes, origins = zip(*signatures)
+                if len(set(projs)) > 1:
+                    warnings.warn("Incompatible map projections!", RuntimeWarning)
+                if len(set(cellsizes)) != 1:
+                    warnings.warn("Incompatible cellsizes", RuntimeWarning)
+                if len(set(origins)) != 1:
+                    warnings.warn("Incompatible origins", RuntimeWarning)
         return func(*args)
     return inner
 
 
-class GeoArrayMeta(object):
+def _toScalar(arr):
+    # convert a 0-dimensional (masked) array into a python scalar
+    out = arr[()]
+    return out if out is np.ma.masked else out.item()
+
+
+def _geoProperty(name, convert=None):
+    # Georeferencing attribute stored in _optinfo. Assignments
+    # invalidate the cached signature, see GeoArray._signature
+    def fget(self):
+        return self.__getattr__(name)
+
+    def fset(self, value):
+        self._optinfo[name] = value if convert is None else convert(value)
+        self._optinfo.pop("_signature", None)
+
+    return property(fget, fset)
+
+
+def _markAllDirty(func):
+    def inner(self, *args, **kwargs):
+        out = func(self, *args, **kwargs)
+        self._markDirty(Ellipsis)
+        return out
+    return inner
+
+
+class GeoArrayMeta(type):
     def __new__(cls, name, bases, attrs):
+        # __nonzero__, __div__ and __idiv__ are Python 2 only
         for key in _METHODS:
-            attrs[key] = _checkMatch(getattr(MaskedArray, key))
-        return type(name, bases, attrs)
+            if hasattr(MaskedArray, key):
+                attrs[key] = _checkMatch(getattr(MaskedArray, key))
+        for key in _INPLACE_METHODS:
+            if hasattr(MaskedArray, key):
+                attrs[key] = _markAllDirty(_checkMatch(getattr(MaskedArray, key)))
+        return super(GeoArrayMeta, cls).__new__(cls, name, bases, attrs)
 
 
-class GeoArray(MaskedArray):
+def _withMetaclass(meta, *bases):
+    # Python 2 and 3 compatible metaclass declaration (see six.with_metaclass),
+    # Python 3 ignores the __metaclass__ attribute. The temporary class is
+    # replaced by the actual class created by meta.
+    class metaclass(type):
+        def __new__(cls, name, this_bases, attrs):
+            return meta(name, bases, attrs)
+    return type.__new__(metaclass, "temporary_class", (), {})
+
+
+class GeoArray(_withMetaclass(GeoArrayMeta, MaskedArray)):
     """
     Arguments
     ----------
@@ -81,6 +202,7 @@ class GeoArray(MaskedArray):
     fobj         : return object from gdal.Open or None
     proj         : _Projection           # Projection Instance holding projection information
     mode         : string
+    lazy_mask    : bool                  # defer the mask computation to its first access
 
     Purpose
     -------
@@ -98,15 +220,17 @@ class GeoArray(MaskedArray):
     Overriding the operators could fix this.
     """
 
-    __metaclass__ = GeoArrayMeta
-
     def __new__(
             cls, data, yorigin, xorigin, origin, cellsize,
             proj=None, fill_value=None, fobj=None, mode=None, # mask=None,
-            *args, **kwargs
+            lazy_mask=False, *args, **kwargs
     ):
-        # The mask will always be calculated, even if its already present or not needed at all...
-        mask = np.zeros_like(data, np.bool) if fill_value is None else data == fill_value
+        if lazy_mask:
+            # The mask stays nomask until the first access, see _mask
+            mask = np.ma.nomask
+        else:
+            # The mask will always be calculated, even if its already present or not needed at all...
+            mask = np.zeros_like(data, np.bool) if fill_value is None else data == fill_value
 
         if origin not in ORIGINS:
             raise TypeError("Argument 'origin' must be one of '{:}'".format(ORIGINS))
@@ -125,7 +249,10 @@ class GeoArray(MaskedArray):
             )
 
         obj = MaskedArray.__new__(cls, data=data, fill_value=fill_value, mask=mask, *args, **kwargs)
-        obj.unshare_mask()
+        if not lazy_mask:
+            obj.unshare_mask()
+        elif fill_value is not None and obj.__dict__.get("_mask") is np.ma.nomask:
+            obj._mask = _LAZYMASK
 
         obj._optinfo["yorigin"]    = yorigin
         obj._optinfo["xorigin"]    = xorigin
@@ -135,9 +262,92 @@ class GeoArray(MaskedArray):
         obj._optinfo["fill_value"] = fill_value #if fill_value is not None else _dtypeInfo(obj.dtype)["min"]
         obj._optinfo["mode"]       = mode
         obj._optinfo["_fobj"]      = fobj
+        obj._optinfo["lazy_mask"]  = lazy_mask
+        # Only grids created on the writable mapping of a file track their
+        # modifications: the mapping and the (row, col) indices of the
+        # modified blocks of fobj, see flush. Views of the mapping share
+        # both, see _update_from
+        tracked = fobj is not None and _isWriteableMapping(data)
+        obj._optinfo["_mapping"]   = data if tracked else None
+        obj._optinfo["_dirty"]     = set() if tracked else None
 
         return obj
 
+    def _update_from(self, obj):
+        # Called by __array_finalize__ for all derived arrays, i.e. views,
+        # copies and the results of operators. These share the _optinfo
+        # entries of obj, but not its dataset. Views of a writable file
+        # mapping record their modifications together with obj.
+        super(GeoArray, self)._update_from(obj)
+        keys = ("_fobj", "_mapping", "_dirty")
+        if self._sharesMapping():
+            keys = ("_fobj",)
+        for key in keys:
+            self._optinfo[key] = None
+            self.__dict__.pop(key, None)
+        # the shape might differ from obj
+        self._optinfo.pop("_signature", None)
+        self.__dict__.pop("_signature", None)
+
+    yorigin  = _geoProperty("yorigin")
+    xorigin  = _geoProperty("xorigin")
+    origin   = _geoProperty("origin")
+    cellsize = _geoProperty("cellsize", tuple)
+
+    def _sharesMapping(self):
+        # Check if the grid uses the memory of a writable file mapping
+        mapping = self._optinfo.get("_mapping")
+        return (
+            mapping is not None
+            and np.may_share_memory(np.ndarray.view(self, np.ndarray), mapping)
+        )
+
+    @property
+    def data(self):
+        # Writes to the returned array bypass __setitem__. numpy.ma reads
+        # the data attribute internally (e.g. in __getitem__), which must
+        # not mark the grid.
+        if not sys._getframe(1).f_globals.get("__name__", "").startswith("numpy."):
+            self._markDirty(Ellipsis)
+        return MaskedArray.data.fget(self)
+
+    # MaskedArray methods writing to the data directly
+    put  = _markAllDirty(MaskedArray.put)
+    sort = _markAllDirty(MaskedArray.sort)
+
+    def __array_wrap__(self, obj, *args, **kwargs):
+        # ufunc with the out argument
+        if obj is self:
+            self._markDirty(Ellipsis)
+        return super(GeoArray, self).__array_wrap__(obj, *args, **kwargs)
+
+    def __array_function__(self, func, types, args, kwargs):
+        # NumPy >= 1.17, functions writing to the out argument or in-place
+        out = super(GeoArray, self).__array_function__(func, types, args, kwargs)
+        targets = kwargs.get("out")
+        targets = list(targets) if isinstance(targets, tuple) else [targets]
+        if func in _INPLACE_FUNCTIONS:
+            targets.append(args[0])
+        for target in targets:
+            if isinstance(target, GeoArray):
+                target._markDirty(Ellipsis)
+        return out
+
+    @property
+    def _mask(self):
+        # A lazy mask is computed from the fill_value on the first access and
+        # shrinked to nomask, if the fill_value does not occur in the data
+        mask = self.__dict__.get("_mask", np.ma.nomask)
+        if mask is _LAZYMASK:
+            mask = np.ma.make_mask(np.ma.getdata(self) == self.fill_value, shrink=True)
+            self.__dict__["_mask"] = mask
+            self.__dict__["_sharedmask"] = False
+        return mask
+
+    @_mask.setter
+    def _mask(self, value):
+        self.__dict__["_mask"] = value
+
     # def __repr__(self):
         # print self._baseclass
         # return "test"
@@ -260,13 +470,41 @@ class GeoArray(MaskedArray):
         except IndexError:
             return 0
 
+    @property
+    def _signature(self):
+        """
+        Return a hashable (projection, cellsize, upper left corner) tuple
+        used to check the compatibility of operands. The tuple is computed
+        once and cached, assignments to the origin, cellsize or projection
+        invalidate the cache.
+        """
+
+        cached = self._optinfo.get("_signature")
+        # the upper left corner of lower/right origins depends on the shape
+        if cached is not None and cached[0] == self.shape:
+            return cached[1]
+
+        # same as getOrigin("ul") without constructing the bbox
+        yorigin, xorigin = self.yorigin, self.xorigin
+        if self.origin[0] == "l":
+            yorigin += self.nrows * self.cellsize[0]
+        if self.origin[1] == "r":
+            xorigin += self.ncols * self.cellsize[1]
+
+        out = (self._proj.fingerprint, self.cellsize, (yorigin, xorigin))
+        self._optinfo["_signature"] = (self.shape, out)
+        return out
+
     @property
     def proj(self):
         return self._proj.get()
 
     @proj.setter
     def proj(self, value):
-        self._proj.set(value)
+        # replace rather than modify the projection, which
+        # is shared with the arrays derived from the grid
+        self._optinfo["_proj"] = _Projection(value)
+        self._optinfo.pop("_signature", None)
 
     @property
     def fill_value(self):
@@ -284,12 +522,15 @@ class GeoArray(MaskedArray):
     def fill_value(self, value):
         # change fill_value and update mask
         self._optinfo["fill_value"] = value
-        self.mask = self == value
+        if self.lazy_mask:
+            self._mask = _LAZYMASK if value is not None else np.ma.nomask
+        else:
+            self.mask = self == value
 
     @property
     def fobj(self):
         if self._fobj is None:
-            self._fobj = _getDataset(self, mem=True)
+            self._optinfo["_fobj"] = _getDataset(self, mem=True)
         return self._fobj
 
     def getOrigin(self, origin=None):
@@ -318,15 +559,47 @@ class GeoArray(MaskedArray):
             bbox["xmax"] if origin[1] == "r" else bbox["xmin"],
         )
 
-    def coordinatesOf(self, y_idx, x_idx):
+    def _boundIndices(self, y_idx, x_idx, bounds, msg):
+        """
+        Apply the out-of-bounds policy given by bounds (one of _BOUNDS) to the
+        given (broadcastable) row/column index arrays.
+        """
+
+        if bounds not in _BOUNDS:
+            raise TypeError("Argument 'bounds' must be one of '{:}'".format(_BOUNDS))
+
+        y_idx, x_idx = np.broadcast_arrays(y_idx, x_idx)
+        outside = ~(
+            (y_idx >= 0) & (y_idx < self.nrows) & (x_idx >= 0) & (x_idx < self.ncols)
+        )
+
+        if bounds == "clip":
+            return np.clip(y_idx, 0, self.nrows-1), np.clip(x_idx, 0, self.ncols-1)
+        if bounds == "mask":
+            return (
+                np.ma.array(np.where(outside, 0, y_idx), mask=outside),
+                np.ma.array(np.where(outside, 0, x_idx), mask=outside),
+            )
+        if np.any(outside):
+            raise ValueError(msg)
+        return y_idx, x_idx
+
+    def coordinatesOf(self, y_idx, x_idx, bounds="raise"):
         """
         Arguments
         ---------
-        y_idx, x_idx :  int
+        y_idx, x_idx :  int/array of int
+
+        Optional Arguments
+        ------------------
+        bounds : {"raise","mask","clip"}   # treatment of indices outside the grid:
+                 default: "raise"          #     "raise" : raise a ValueError
+                                           #     "mask"  : mask the respective output values
+                                           #     "clip"  : clip indices to the grid domain
 
         Returns
         -------
-        (scalar, scalar)
+        (scalar, scalar) / (np.ndarray, np.ndarray)
 
         Purpose
         -------
@@ -337,42 +610,137 @@ class GeoArray(MaskedArray):
             "lr": lower-right corner
             "ul": upper-left corner
             "ur": upper-right corner
+        Array arguments are broadcasted against each other and return arrays
+        of the same shape.
         """
 
-        if (y_idx < 0 or x_idx < 0) or (y_idx >= self.nrows or x_idx >= self.ncols):
-            raise ValueError("Index out of bounds !")
+        yidx, xidx = self._boundIndices(
+            y_idx, x_idx, bounds, "Index out of bounds !"
+        )
 
         yorigin, xorigin = self.getOrigin("ul")
-        return (
-            yorigin - y_idx * abs(self.cellsize[0]),
-            xorigin + x_idx * abs(self.cellsize[1]),
+        out = (
+            yorigin - yidx * abs(self.cellsize[0]),
+            xorigin + xidx * abs(self.cellsize[1]),
         )
+        if np.ndim(y_idx) == 0 and np.ndim(x_idx) == 0:
+            return tuple(_toScalar(o) for o in out)
+        return out
 
-    def indexOf(self, ycoor, xcoor):
+    def indexOf(self, ycoor, xcoor, bounds="raise"):
         """
         Arguments
         ---------
-        ycoor, xcoor : scalar
+        ycoor, xcoor : scalar/array of scalar
+
+        Optional Arguments
+        ------------------
+        bounds : {"raise","mask","clip"}   # treatment of coordinates outside the grid:
+                 default: "raise"          #     "raise" : raise a ValueError
+                                           #     "mask"  : mask the respective output values
+                                           #     "clip"  : return the nearest border cell
 
         Returns
         -------
-        (int, int)
+        (int, int) / (np.ndarray, np.ndarray)
 
         Purpose
         -------
         Find the grid cell into which the given coordinates
         fall and return its row/column index values.
+        Array arguments are broadcasted against each other and return arrays
+        of the same shape.
         """
 
         yorigin, xorigin = self.getOrigin("ul")
         cellsize = np.abs(self.cellsize)
-        yidx = int(floor((yorigin - ycoor)/float(cellsize[0])))
-        xidx = int(floor((xcoor - xorigin )/float(cellsize[1])))
+        yidx = np.floor((yorigin - np.asarray(ycoor))/float(cellsize[0]))
+        xidx = np.floor((np.asarray(xcoor) - xorigin)/float(cellsize[1]))
 
-        if yidx < 0 or yidx >= self.nrows or xidx < 0 or xidx >= self.ncols:
-            raise ValueError("Given Coordinates not within the grid domain!")
+        yidx, xidx = self._boundIndices(
+            yidx, xidx, bounds, "Given Coordinates not within the grid domain!"
+        )
 
-        return yidx, xidx
+        out = (yidx.astype(int), xidx.astype(int))
+        if np.ndim(ycoor) == 0 and np.ndim(xcoor) == 0:
+            return tuple(_toScalar(o) for o in out)
+        return out
+
+    def _gather(self, y_idx, x_idx):
+        """
+        Return the data and mask values of the cells given by the row/column
+        index arrays for all bands.
+        """
+
+        values = np.ma.getdata(self)[..., y_idx, x_idx]
+        mask = self.__dict__.get("_mask")
+        if mask is _LAZYMASK:
+            # avoid the evaluation of the pending mask
+            return values, values == self.fill_value
+        if mask is np.ma.nomask or mask is None:
+            return values, np.zeros(values.shape, dtype=bool)
+        return values, mask[..., y_idx, x_idx]
+
+    def sample(self, ycoor, xcoor, method="nearest"):
+        """
+        Arguments
+        ---------
+        ycoor, xcoor : scalar/array of scalar
+
+        Optional Arguments
+        ------------------
+        method : {"nearest","bilinear","cubic"}  # sampling method
+                 default: "nearest"
+
+        Returns
+        -------
+        numpy.ma.MaskedArray
+
+        Purpose
+        -------
+        Return the values at the given coordinates for all bands, i.e. an array
+        of shape grid.shape[:-2] + numpy.broadcast(ycoor, xcoor).shape.
+        The interpolation methods use the values at the cell centers.
+        Values outside of the grid domain or derived from masked
+        cells are masked.
+        """
+
+        if method not in _SAMPLING:
+            raise TypeError("Argument 'method' must be one of '{:}'".format(tuple(_SAMPLING)))
+
+        yorigin, xorigin = self.getOrigin("ul")
+        cellsize = np.abs(self.cellsize)
+        ycoor, xcoor = np.broadcast_arrays(np.asarray(ycoor), np.asarray(xcoor))
+
+        # fractional row/column positions, following indexOf
+        ypos = (yorigin - ycoor)/float(cellsize[0])
+        xpos = (xcoor - xorigin)/float(cellsize[1])
+        outside = ~((ypos >= 0) & (ypos < self.nrows) & (xpos >= 0) & (xpos < self.ncols))
+        ypos = np.where(outside, 0, ypos)
+        xpos = np.where(outside, 0, xpos)
+
+        if method == "nearest":
+            values, mask = self._gather(
+                np.floor(ypos).astype(int), np.floor(xpos).astype(int)
+            )
+        else:
+            # distances relative to the cell centers
+            ypos, xpos = ypos - .5, xpos - .5
+            ystart, xstart = np.floor(ypos), np.floor(xpos)
+            yoffsets, yweights = _SAMPLING[method](ypos - ystart)
+            xoffsets, xweights = _SAMPLING[method](xpos - xstart)
+
+            values, mask = 0., False
+            for yoff, yweight in zip(yoffsets, yweights):
+                y_idx = np.clip(ystart + yoff, 0, self.nrows-1).astype(int)
+                for xoff, xweight in zip(xoffsets, xweights):
+                    x_idx = np.clip(xstart + xoff, 0, self.ncols-1).astype(int)
+                    weight = yweight * xweight
+                    vals, msk = self._gather(y_idx, x_idx)
+                    values = values + np.where(msk, 0, vals) * weight
+                    mask = mask | (msk & (weight != 0))
+
+        return np.ma.array(values, mask=mask | outside, fill_value=self.fill_value)
 
     def fill(self, fill_value):
         """
@@ -387,7 +755,8 @@ class GeoArray(MaskedArray):
             cellsize   = self.cellsize,
             proj       = self.proj,
             fill_value = fill_value,
-            mode       = self.mode
+            mode       = self.mode,
+            lazy_mask  = self.lazy_mask,
         )
 
     def trim(self):
@@ -407,7 +776,7 @@ class GeoArray(MaskedArray):
         """
 
         try:
-            y_idx, x_idx = np.where(self.data != self.fill_value)
+            y_idx, x_idx = np.where(np.ma.getdata(self) != self.fill_value)
             return self.removeCells(
                 top  = min(y_idx), bottom = self.nrows-max(y_idx)-1,
                 left = min(x_idx), right  = self.ncols-max(x_idx)-1
@@ -509,6 +878,7 @@ class GeoArray(MaskedArray):
             cellsize    = (abs(self.cellsize[0])*-1, abs(self.cellsize[1])),
             proj        = self.proj,
             mode        = self.mode,
+            lazy_mask   = self.lazy_mask,
         )
 
         # the Ellipsis ensures that the function works
@@ -591,7 +961,7 @@ class GeoArray(MaskedArray):
 
     def __deepcopy__(self, memo):
         return GeoArray(
-            data       = self.data.copy(),
+            data       = np.ma.getdata(self).copy(),
             yorigin    = self.yorigin,
             xorigin    = self.xorigin,
             origin     = self.origin,
@@ -599,6 +969,7 @@ class GeoArray(MaskedArray):
             proj       = copy.deepcopy(self.proj),
             fill_value = self.fill_value,
             mode       = self.mode,
+            lazy_mask  = self.lazy_mask,
         )
 
     @property
@@ -618,13 +989,45 @@ class GeoArray(MaskedArray):
             _arange(xorigin, cellsize[1], self.ncols)
         )
 
-    def __getitem__(self, slc):
+    def _basicExtent(self, ndim, axes, fixed):
+        """
+        Arguments
+        ---------
+        ndim  : int    # number of dimensions of the indexed array
+        axes  : tuple  # output dimensions as returned by utils._normalizeIndex
+        fixed : dict   # integer indexed dimensions as returned by utils._normalizeIndex
 
-        data = super(GeoArray, self).__getitem__(slc)
+        Returns
+        -------
+        ((scalar, scalar), (scalar, scalar))
 
-        # empty array
-        if data.size == 0:
-            return data
+        Purpose
+        -------
+        Return the coordinates of the first and last cell along the two trailing
+        dimensions of an array derived from the instance by basic indexing.
+        The values are computed from the index arithmetic only, i.e. independent
+        of the grid size.
+        """
+
+        out = []
+        dims = (self.ndim-2, self.ndim-1)
+        positions = (ndim-2, ndim-1)
+        for dim, pos, origin, cellsize in zip(dims, positions, self.getOrigin(), self.cellsize):
+            if dim in fixed:
+                first = last = fixed[dim]
+            else:
+                start, step, count = [sel for axis, sel in axes if axis == dim][0]
+                first = last = start
+                if pos >= 0 and axes[pos][0] == dim:
+                    last = start + step * (count - 1)
+            out.append((origin + first * cellsize, origin + last * cellsize))
+        return out
+
+    def _fancyExtent(self, slc):
+        """
+        Return the coordinates of the first and last cell along the two trailing
+        dimensions of an array derived from the instance by advanced indexing.
+        """
 
         x, y = _broadcastedMeshgrid(*self.coordinates[::-1])
 
@@ -637,39 +1040,369 @@ class GeoArray(MaskedArray):
             s = [0] * arr.ndim
             s[idx] = slice(None, None, None)
             bbox.append((arr[s][0], arr[s][-1]))
+        return bbox
 
-        try:
-            ystart, ystop = sorted(bbox[0], reverse=data.origin[0]=="u")
-            xstart, xstop = sorted(bbox[1], reverse=data.origin[1]=="r")
-        except AttributeError:
-            # scalar
+    def __getitem__(self, slc):
+
+        if self.__dict__.get("_mask") is _LAZYMASK:
+            # the mask is fully defined by the fill_value, index the data only
+            data = np.ma.getdata(self)[slc]
+            if np.ndim(data) == 0:
+                return np.ma.masked if data == self.fill_value else data
+        else:
+            data = super(GeoArray, self).__getitem__(slc)
+            if not isinstance(data, GeoArray):
+                # scalar
+                return data
+
+        # empty array
+        if data.size == 0:
             return data
 
+        origin = self.origin
+
+        index = _normalizeIndex(slc, self.shape) if self.ndim > 1 else None
+        if index is None:
+            bbox = self._fancyExtent(slc)
+        else:
+            bbox = self._basicExtent(data.ndim, *index)
+
+        ystart, ystop = sorted(bbox[0], reverse=origin[0]=="u")
+        xstart, xstop = sorted(bbox[1], reverse=origin[1]=="r")
+
         nrows, ncols = ((1, 1) + data.shape)[-2:]
         cellsize = (
             float(ystop-ystart)/(nrows-1) if nrows > 1 else self.cellsize[-2],
             float(xstop-xstart)/(ncols-1) if ncols > 1 else self.cellsize[-1],
         )
 
-        return GeoArray(
-            data       = data.data,
+        out = GeoArray(
+            data       = np.ma.getdata(data),
             yorigin    = ystart,
             xorigin    = xstart,
             origin     = self.origin,
             cellsize   = cellsize,
             proj       = self.proj,
             fill_value = self.fill_value,
-            mode       = self.mode
+            mode       = self.mode,
+            lazy_mask  = self.lazy_mask,
+        )
+        # views of a writable file mapping record their modifications
+        out._optinfo["_mapping"] = self._optinfo.get("_mapping")
+        if out._sharesMapping():
+            out._optinfo["_dirty"] = self._dirty
+        else:
+            out._optinfo["_mapping"] = None
+        return out
+
+    def blocks(self, blocksize=None, halo=0):
+        """
+        Arguments
+        ---------
+        None
+
+        Optional Arguments
+        ------------------
+        blocksize : (int, int)  # (nrows, ncols) of the blocks, defaults to
+                                # the native block layout of the underlying
+                                # file or _BLOCKSIZE
+        halo      : int         # number of cells to extend the blocks at each side
+
+        Returns
+        -------
+        generator of GeoArray
+
+        Purpose
+        -------
+        Iterate over the grid in blocks. The blocks are extended by halo
+        cells at each side, truncated at the grid's border. The widths of
+        the halo are available as the (top, left, bottom, right) tuple
+        block.halo and will be removed by wrapper.writeblocks.
+        """
+
+        if blocksize is None:
+            fobj = self._fobj
+            blocksize = _blockSize(fobj) if fobj and _isFileBacked(fobj) else _BLOCKSIZE
+
+        for window, halo_widths in _blockWindows((self.nrows, self.ncols), blocksize, halo):
+            row, col, nrows, ncols = window
+            block = self[..., row:row+nrows, col:col+ncols]
+            block._optinfo["halo"] = halo_widths
+            yield block
+
+    def __setitem__(self, slc, value):
+        super(GeoArray, self).__setitem__(slc, value)
+        self._markDirty(slc)
+
+    def _markDirty(self, slc):
+        # Record the blocks of the underlying dataset touched by an
+        # assignment to slc, see flush. Views of the file mapping locate
+        # the assigned cells by their memory.
+        dirty = self._optinfo.get("_dirty")
+        if dirty is None or self.ndim < 1:
+            return
+        mapping = self._mapping
+        if self._ownsMapping():
+            extent = _indexExtent(slc, self.shape)
+        else:
+            data = np.ma.getdata(self)
+            target = data if slc is Ellipsis else data[slc]
+            if not isinstance(target, np.ndarray) or not np.may_share_memory(target, mapping):
+                # copies, e.g. by advanced or scalar indexing
+                target = data
+            extent = _memoryExtent(target, mapping)
+        if extent is None:
+            return
+        (rowmin, rowmax), (colmin, colmax) = extent
+        brows, bcols = _blockSize(_mappedDataset(mapping))
+        dirty.update(
+            (row, col)
+            for row in range(rowmin // brows, rowmax // brows + 1)
+            for col in range(colmin // bcols, colmax // bcols + 1)
+        )
+
+    def _ownsMapping(self):
+        # Check if the grid is the one created on the writable file mapping,
+        # only this grid writes its modifications back to the file
+        mapping = self._optinfo.get("_mapping")
+        return (
+            mapping is not None
+            and self._fobj is not None
+            and self.shape == mapping.shape
+            and np.shares_memory(np.ma.getdata(self), mapping)
+        )
+
+    def _dirtyWindows(self):
+        # (row, col, nrows, ncols) windows of the modified blocks,
+        # consecutive blocks within a block row are merged
+        brows, bcols = _blockSize(self._fobj)
+        windows = []
+        for row, col in sorted(self._dirty):
+            if windows and windows[-1][0] == row and windows[-1][2] == col:
+                windows[-1][2] += 1
+            else:
+                windows.append([row, col, col + 1])
+        return [
+            (
+                row * brows, start * bcols,
+                min(brows, self.nrows - row * brows),
+                min((stop - start) * bcols, self.ncols - start * bcols)
+            )
+            for row, start, stop in windows
+        ]
+
+    def flush(self, full=False):
+        """
+        Arguments
+        ---------
+        None
+
+        Optional Arguments
+        ------------------
+        full : bool  # rewrite all blocks of the file
+               default: False
+
+        Returns
+        -------
+        None
+
+        Purpose
+        -------
+        Write all changes to a writable file-backed grid (i.e. opened with
+        mode="r+") to disk. Only the blocks of the file modified by item
+        assignments, in-place operators and functions or the out argument
+        of ufuncs on the grid and its views are rewritten. Accessing the
+        data attribute marks the full grid (view) as modified. Masked cells
+        within these blocks are set to the fill_value.
+
+        Writes to plain numpy arrays sharing the grid's memory (e.g. created
+        by numpy.asarray) are not tracked, these need full=True. Copies and
+        the results of operators are not backed by the file, flushing them
+        or views has no effect.
+        """
+
+        if not self._ownsMapping():
+            return
+        if full:
+            self._markDirty(Ellipsis)
+        if not self._dirty:
+            return
+
+        windows = self._dirtyWindows()
+        mask = self.__dict__.get("_mask")
+        if self.fill_value is not None and mask is not _LAZYMASK and np.any(mask):
+            for row, col, nrows, ncols in windows:
+                window = (Ellipsis, slice(row, row+nrows), slice(col, col+ncols))
+                np.copyto(
+                    np.ma.getdata(self)[window], self.fill_value,
+                    where=mask[window], casting="unsafe"
+                )
+        _flushDataset(self._fobj, self, windows)
+        self._dirty.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        # the virtual memory mapping holds its own reference to the dataset
+        # and is released first, once the last view of it is gone
+        self.flush()
+        self._optinfo.update(_fobj=None, _mapping=None, _dirty=None)
+
+    def tofile(self, fname, tiled=None, blocksize=None, compress=None,
+               predictor=None, bigtiff=None, num_threads=None,
+               cog=False, resampling="nearest"):
+        """
+        Arguments
+        ---------
+        fname : str  # file name, the extension defines the format (see gdalio._DRIVER_DICT)
+
+        Optional Arguments
+        ------------------
+        tiled       : bool                # write a tiled file
+        blocksize   : int/(int, int)      # (nrows, ncols) of the tiles/strips
+        compress    : str                 # compression, e.g. "deflate", "lzw", "zstd", "none"
+        predictor   : int                 # compression predictor
+        bigtiff     : str                 # "yes", "no", "if_needed", "if_safer"
+        num_threads : int/str             # number of compression threads or "all_cpus"
+        cog         : bool                # write a cloud optimized GeoTIFF, see tocog
+        resampling  : str                 # overview resampling method of cloud optimized
+                                          # GeoTIFFs, one of gdalfuncs._RESAMPLING
+
+        Returns
+        -------
+        None
+
+        Purpose
+        -------
+        Write the grid to file. Options not given fall back to the driver
+        defaults in gdalio._CREATION_DEFAULTS (GeoTIFFs are written tiled and
+        deflate compressed), options not supported by the driver are
+        ignored with a warning. Writing a grid opened with mode="r+" to
+        its own file only flushes the modified blocks. Grids mapping a
+        replaced file keep its previous content, files mapped for writing
+        by other grids cannot be replaced (IOError).
+        """
+
+        if self._ownsMapping() and _isSource(self._fobj, fname):
+            self.flush()
+            return
+
+        options = {
+            "tiled"       : tiled,
+            "blocksize"   : blocksize,
+            "compress"    : compress,
+            "predictor"   : predictor,
+            "bigtiff"     : bigtiff,
+            "num_threads" : num_threads,
+        }
+        if cog:
+            _toCog(self, fname, options, resampling)
+        else:
+            _toFile(self, fname, options)
+
+    def atofile(self, fname, **kwargs):
+        """
+        Arguments
+        ---------
+        fname : str  # file name
+
+        Optional Arguments
+        ------------------
+        see GeoArray.tofile
+
+        Returns
+        -------
+        coroutine
+
+        Purpose
+        -------
+        Asynchronous version of tofile, the GDAL calls run in the
+        thread pool of the aio module. Python >= 3.6 only.
+        """
+
+        from .aio import atofile
+        return atofile(self, fname, **kwargs)
+
+    def tocog(self, fname, resampling="nearest", blocksize=None, compress=None,
+              predictor=None, num_threads=None):
+        """
+        Arguments
+        ---------
+        fname : str  # file name with the extension '.tif'
+
+        Optional Arguments
+        ------------------
+        resampling  : str      # overview resampling method, one of gdalfuncs._RESAMPLING
+        blocksize, compress,   # see tofile
+        predictor, num_threads
+
+        Returns
+        -------
+        None
+
+        Purpose
+        -------
+        Write the grid to a cloud optimized GeoTIFF, i.e. a tiled and
+        compressed GeoTIFF with internal overviews down to the size of
+        a single tile.
+        """
+
+        self.tofile(
+            fname, blocksize=blocksize, compress=compress, predictor=predictor,
+            num_threads=num_threads, cog=True, resampling=resampling
         )
 
-    # def flush(self):
-    #     if self._fobj:
-    #         self._fobj.FlushCache()
 
-    def __del__(self):
-        # the virtual memory mapping needs to be released BEFORE the fobj
-        self._optinfo["data"] = None
-        self._optinfo["_fobj"] = None
+class GeoInfo(object):
+    """
+    Arguments
+    ----------
+    shape        : tuple                 # shape of the (virtual) data
+    dtype        : np.dtype
+    yorigin      : scalar                # y-coordinate of origin
+    xorigin      : scalar                # x-coordinate of origin
+    origin       : {"ul","ur","ll","lr"} # position of the grid origin
+    cellsize     : (scalar, scalar)
+    proj         : _Projection/dict/str/int
+    fill_value   : scalar/None
+    mode         : string
+    fill_values  : tuple                 # fill values of all bands
+    fname        : str/None              # file name
+
+    Purpose
+    -------
+    Lightweight description of a grid without any data, as returned
+    by wrapper.info. Shares the geometry related properties with GeoArray.
+    """
+
+    def __init__(self, shape, dtype, yorigin, xorigin, origin, cellsize, proj=None,
+                 fill_value=None, mode=None, fill_values=None, fname=None):
+        self.shape       = tuple(shape)
+        self.dtype       = dtype
+        self.yorigin     = yorigin
+        self.xorigin     = xorigin
+        self.origin      = origin
+        self.cellsize    = tuple(cellsize)
+        self._proj       = _Projection(proj)
+        self.fill_value  = fill_value
+        self.mode        = mode
+        self.fill_values = tuple(fill_values or (fill_value,))
+        self.fname       = fname
+
+    header    = GeoArray.__dict__["header"]
+    bbox      = GeoArray.__dict__["bbox"]
+    nbands    = GeoArray.__dict__["nbands"]
+    nrows     = GeoArray.__dict__["nrows"]
+    ncols     = GeoArray.__dict__["ncols"]
+    proj      = GeoArray.__dict__["proj"]
+    getOrigin = GeoArray.__dict__["getOrigin"]
 
-    def tofile(self, fname):
-        _toFile(self, fname)
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    def __repr__(self):
+        return "GeoInfo(fname={:}, shape={:}, dtype={:}, bbox={:})".format(
+            self.fname, self.shape, self.dtype, self.bbox
+        )
@@ -3,9 +3,11 @@
 
 import gdal, osr
 import numpy as np
-import wrapper as ga
-from gdalio import _getDataset, _fromDataset
-from gdaltrans import _Projection, _Transformer
+import warnings
+from . import wrapper as ga
+from .gdalio import _getDataset, _rawDataset, _fromDataset
+from .gdaltrans import _Projection, _Transformer
+from .core import _SAMPLING
 
 gdal.UseExceptions()
 gdal.PushErrorHandler('CPLQuietErrorHandler')
@@ -25,7 +27,33 @@ _RESAMPLING = {
     "min"         : getattr(gdal, "GRA_Min", None),
 }
 
-def _warpTo(source, target, func, max_error=0.125):
+def _warpOptions(num_threads=None, warp_memory_limit=None, chunked=False):
+    """
+    Arguments
+    ---------
+    num_threads       : int/str    # number of warping threads or "all_cpus"
+    warp_memory_limit : int/float  # size of the warping buffer in MB
+    chunked           : bool       # overlap the I/O and the warping of the chunks
+
+    Returns
+    -------
+    dict
+
+    Purpose
+    -------
+    Translate the given options into the keyword arguments of gdal.WarpOptions
+    """
+
+    out = {"multithread": bool(chunked)}
+    if num_threads is not None:
+        out["warpOptions"] = ["NUM_THREADS={:}".format(str(num_threads).upper())]
+    if warp_memory_limit is not None:
+        out["warpMemoryLimit"] = warp_memory_limit
+    return out
+
+
+def _warpTo(source, target, func, max_error=0.125,
+            num_threads=None, warp_memory_limit=None, chunked=False):
 
     if func is None:
         raise TypeError("Resampling method {} not available in your GDAL version".format(func))
@@ -49,16 +77,29 @@ def _warpTo(source, target, func, max_error=0.125):
 
     out = _getDataset(target, True)
 
-    gdal.ReprojectImage(
-        _getDataset(source), out,
-        None, None,
-        _RESAMPLING[func],
-        0.0, max_error
-    )
+    if hasattr(gdal, "Warp"):
+        # GDAL >= 2.1
+        gdal.Warp(
+            _rawDataset(out), _rawDataset(_getDataset(source)),
+            options=gdal.WarpOptions(
+                resampleAlg    = _RESAMPLING[func],
+                errorThreshold = max_error,
+                **_warpOptions(num_threads, warp_memory_limit, chunked)
+            )
+        )
+    else:
+        gdal.ReprojectImage(
+            _rawDataset(_getDataset(source)), _rawDataset(out),
+            None, None,
+            _RESAMPLING[func],
+            # WarpMemoryLimit is given in bytes
+            (warp_memory_limit or 0) * 2**20, max_error
+        )
 
-    return _fromDataset(out)
+    return ga.fromdataset(out)
 
-def project(grid, proj, cellsize=None, func="nearest", max_error=0.125):
+def project(grid, proj, cellsize=None, func="nearest", max_error=0.125,
+            num_threads=None, warp_memory_limit=None, chunked=False):
 
     bbox = grid.bbox
     proj = _Projection(proj)
@@ -92,26 +133,510 @@ def project(grid, proj, cellsize=None, func="nearest", max_error=0.125):
     )
 
     return resample(
-        source    = grid,
-        target    = target,
-        func      = func,
-        max_error = max_error,
+        source            = grid,
+        target            = target,
+        func              = func,
+        max_error         = max_error,
+        num_threads       = num_threads,
+        warp_memory_limit = warp_memory_limit,
+        chunked           = chunked,
     )
 
-def resample(source, target, func="nearest", max_error=0.125):
+def resample(source, target, func="nearest", max_error=0.125,
+             num_threads=None, warp_memory_limit=None, chunked=False):
+    """
+    Arguments
+    ---------
+    source : GeoArray  # grid to resample
+    target : GeoArray  # grid defining the output extent, cellsize and projection
+
+    Optional Arguments
+    ------------------
+    func              : str        # resampling method, one of _RESAMPLING
+    max_error         : float      # error threshold of the transformation approximation
+    num_threads       : int/str    # number of warping threads or "all_cpus"
+    warp_memory_limit : int/float  # size of the warping buffer in MB
+    chunked           : bool       # overlap the I/O and the warping of the chunks
+
+    Returns
+    -------
+    GeoArray
+
+    Purpose
+    -------
+    Warp source onto the grid defined by target
+    """
+
     return _warpTo(
-        source    = source,
-        target    = target,
-        func      = func,
-        max_error = max_error,
+        source            = source,
+        target            = target,
+        func              = func,
+        max_error         = max_error,
+        num_threads       = num_threads,
+        warp_memory_limit = warp_memory_limit,
+        chunked           = chunked,
     )
 
+def _cellCenters(grid):
+    """
+    Return the coordinates of all cell centers of grid as two
+    arrays of shape (nrows, ncols)
+    """
+    yorigin, xorigin = grid.getOrigin("ul")
+    cellsize = np.abs(grid.cellsize)
+    ycoor = yorigin - (np.arange(grid.nrows) + .5) * cellsize[0]
+    xcoor = xorigin + (np.arange(grid.ncols) + .5) * cellsize[1]
+    return np.meshgrid(ycoor, xcoor, indexing="ij")
+
+
+class WarpPlan(object):
+    def __init__(self, source_like, target_like, func="nearest"):
+        """
+        Arguments
+        ---------
+        source_like : GeoArray  # grid defining the geometry of the input arrays
+        target_like : GeoArray  # grid defining the output extent, cellsize and projection
+
+        Optional Arguments
+        ------------------
+        func : {"nearest","bilinear","cubic","average"}  # resampling method
+               default: "nearest"
+
+        Purpose
+        -------
+        Precompute the mapping between the cells of source_like and target_like,
+        to resample any number of arrays sharing the geometry of source_like
+        onto target_like. The interpolation methods use the values at the
+        source cell centers. "average" aggregates all source cells whose
+        centers fall into a target cell.
+        """
+
+        if func not in _SAMPLING and func != "average":
+            raise TypeError("Argument 'func' must be one of '{:}'".format(
+                tuple(_SAMPLING) + ("average",))
+            )
+
+        self.func = func
+        self._sshape = (source_like.nrows, source_like.ncols)
+        self._tshape = (target_like.nrows, target_like.ncols)
+        self._header = {
+            "yorigin"  : target_like.yorigin,
+            "xorigin"  : target_like.xorigin,
+            "origin"   : target_like.origin,
+            "cellsize" : target_like.cellsize,
+            "proj"     : target_like.proj,
+            "mode"     : target_like.mode,
+        }
+
+        if func == "average":
+            self._target = self._averageMapping(source_like, target_like)
+        else:
+            self._index, self._weights, self._outside = self._kernelMapping(
+                source_like, target_like
+            )
+
+    @staticmethod
+    def _transform(ycoor, xcoor, sproj, tproj):
+        if sproj and tproj and sproj != tproj:
+            return _Transformer(sproj, tproj)(ycoor, xcoor)
+        return ycoor, xcoor
+
+    def _kernelMapping(self, source_like, target_like):
+        """
+        Return the flat source indices and weights of all target cells,
+        i.e. two arrays of shape (nneighbours, ntargetcells), together
+        with the target cells outside of the source domain
+        """
+
+        nrows, ncols = self._sshape
+        ycoor, xcoor = self._transform(
+            *_cellCenters(target_like),
+            sproj=target_like._proj, tproj=source_like._proj
+        )
+
+        # fractional row/column positions, following GeoArray.sample
+        yorigin, xorigin = source_like.getOrigin("ul")
+        cellsize = np.abs(source_like.cellsize)
+        ypos = ((yorigin - ycoor)/float(cellsize[0])).ravel()
+        xpos = ((xcoor - xorigin)/float(cellsize[1])).ravel()
+        outside = ~((ypos >= 0) & (ypos < nrows) & (xpos >= 0) & (xpos < ncols))
+        ypos = np.where(outside, 0, ypos)
+        xpos = np.where(outside, 0, xpos)
+
+        if self.func == "nearest":
+            index = np.floor(ypos).astype(np.intp) * ncols + np.floor(xpos).astype(np.intp)
+            return index[None], None, outside
+
+        ypos, xpos = ypos - .5, xpos - .5
+        ystart, xstart = np.floor(ypos), np.floor(xpos)
+        yoffsets, yweights = _SAMPLING[self.func](ypos - ystart)
+        xoffsets, xweights = _SAMPLING[self.func](xpos - xstart)
+
+        index, weights = [], []
+        for yoff, yweight in zip(yoffsets, yweights):
+            y_idx = np.clip(ystart + yoff, 0, nrows-1).astype(np.intp)
+            for xoff, xweight in zip(xoffsets, xweights):
+                x_idx = np.clip(xstart + xoff, 0, ncols-1).astype(np.intp)
+                index.append(y_idx * ncols + x_idx)
+                weights.append(yweight * xweight)
+
+        return np.array(index), np.array(weights), outside
+
+    def _averageMapping(self, source_like, target_like):
+        """
+        Return the flat target index of all source cells, -1 for
+        source cells outside of the target domain
+        """
+
+        nrows, ncols = self._tshape
+        ycoor, xcoor = self._transform(
+            *_cellCenters(source_like),
+            sproj=source_like._proj, tproj=target_like._proj
+        )
+
+        yorigin, xorigin = target_like.getOrigin("ul")
+        cellsize = np.abs(target_like.cellsize)
+        y_idx = np.floor((yorigin - ycoor)/float(cellsize[0])).ravel()
+        x_idx = np.floor((xcoor - xorigin)/float(cellsize[1])).ravel()
+        inside = (y_idx >= 0) & (y_idx < nrows) & (x_idx >= 0) & (x_idx < ncols)
+        return np.where(inside, y_idx * ncols + x_idx, -1).astype(np.intp)
+
+    def __call__(self, grid):
+        """
+        Arguments
+        ---------
+        grid : GeoArray/numpy.ma.MaskedArray  # array of shape (..., nrows, ncols)
+
+        Returns
+        -------
+        GeoArray
+
+        Purpose
+        -------
+        Resample grid onto the target geometry. Target cells outside of the
+        source domain or derived from masked cells only are set to
+        the fill_value of grid.
+        """
+
+        if grid.shape[-2:] != self._sshape:
+            raise ValueError("Shape of grid does not match the plan's source shape {:}".format(
+                self._sshape)
+            )
+
+        bshape = grid.shape[:-2]
+        data = np.ma.getdata(grid).reshape(bshape + (-1,))
+        mask = np.ma.getmaskarray(grid).reshape(bshape + (-1,))
+
+        if self.func == "average":
+            values, outmask = self._average(data, mask)
+        elif self._weights is None:
+            values = data[..., self._index[0]]
+            outmask = mask[..., self._index[0]] | self._outside
+        else:
+            vals = data[..., self._index]
+            msk = mask[..., self._index]
+            values = (np.where(msk, 0, vals) * self._weights).sum(axis=-2)
+            outmask = (msk & (self._weights != 0)).any(axis=-2) | self._outside
+
+        fill_value = getattr(grid, "fill_value", None)
+        dtype = grid.dtype if self.func == "nearest" else np.result_type(grid.dtype, np.float32)
+        values = np.where(outmask, 0 if fill_value is None else fill_value, values)
+
+        out = ga.array(
+            data       = values.reshape(bshape + self._tshape).astype(dtype),
+            fill_value = fill_value,
+            **self._header
+        )
+        if fill_value is None:
+            out.mask = outmask.reshape(out.shape)
+        return out
+
+    def _average(self, data, mask):
+        """
+        Return the mean of all unmasked source cells per target cell
+        together with the mask of empty target cells.
+        """
+
+        ntarget = self._tshape[0] * self._tshape[1]
+        nbands = int(np.prod(data.shape[:-1]))
+        data = data.reshape(nbands, -1)
+        valid = ~mask.reshape(nbands, -1) & (self._target >= 0)
+
+        # shift the target indices of the bands to allow a single bincount
+        index = (np.arange(nbands)[:, None] * ntarget + self._target)[valid]
+        sums = np.bincount(index, weights=data[valid], minlength=nbands*ntarget)
+        counts = np.bincount(index, minlength=nbands*ntarget)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values = sums / counts
+        shape = mask.shape[:-1] + (ntarget,)
+        return values.reshape(shape), (counts == 0).reshape(shape)
+
+def _blockMode(values, mask):
+    """
+    Return the most frequent unmasked value along the last axis of values.
+    Ties are resolved in favour of the smaller value.
+    """
+
+    svalues = np.ma.sort(np.ma.array(values, mask=mask), axis=-1, endwith=True)
+    data, mask = np.ma.getdata(svalues), np.ma.getmaskarray(svalues)
+
+    # length of the run of equal values ending at each position
+    positions = np.arange(data.shape[-1])
+    starts = np.ones(data.shape, dtype=bool)
+    starts[..., 1:] = data[..., 1:] != data[..., :-1]
+    runstart = np.maximum.accumulate(np.where(starts, positions, 0), axis=-1)
+    runlength = np.where(mask, 0, positions - runstart + 1)
+
+    idx = np.argmax(runlength, axis=-1).ravel()
+    flat = data.reshape(-1, data.shape[-1])
+    return flat[np.arange(len(flat)), idx].reshape(data.shape[:-1])
+
+def _blockAggregate(data, mask, func):
+    """
+    Arguments
+    ---------
+    data, mask : np.ndarray  # arrays of shape (..., nrows, factor, ncols, factor)
+    func       : str         # one of _AGGREGATION
+
+    Returns
+    -------
+    (np.ndarray, np.ndarray)  # values and mask of shape (..., nrows, ncols)
+    """
+
+    axis = (-3, -1)
+    counts = (~mask).sum(axis=axis)
+    if func == "count":
+        return counts, np.zeros(counts.shape, dtype=bool)
+
+    if func in ("average", "mean", "sum"):
+        values = np.where(mask, 0, data).sum(axis=axis)
+        if func != "sum":
+            with np.errstate(invalid="ignore", divide="ignore"):
+                values = values / counts.astype(np.float64)
+    elif func in ("min", "max"):
+        info = np.iinfo if np.issubdtype(data.dtype, np.integer) else np.finfo
+        if func == "min":
+            values = np.where(mask, info(data.dtype).max, data).min(axis=axis)
+        else:
+            values = np.where(mask, info(data.dtype).min, data).max(axis=axis)
+    else:
+        shape = data.shape[:-4] + (data.shape[-4], data.shape[-2], -1)
+        values = _blockMode(
+            np.swapaxes(data, -3, -2).reshape(shape),
+            np.swapaxes(mask, -3, -2).reshape(shape)
+        )
+
+    return values, counts == 0
+
+# Aggregation methods of the integer-factor fast path in rescale
+_AGGREGATION = ("average", "mean", "sum", "min", "max", "mode", "count")
+
+def _isInteger(value):
+    return float(value).is_integer() and value >= 1
+
 def rescale(source, scaling_factor, func="nearest"):
-    scaled_gridsize = (source.shape[-2] / scaling_factor,
-                       source.shape[-1] / scaling_factor)
+    """
+    Arguments
+    ---------
+    source         : GeoArray  # grid to rescale
+    scaling_factor : int/float # ratio of the target and source cellsizes
+
+    Optional Arguments
+    ------------------
+    func : str  # resampling method, one of _RESAMPLING or _AGGREGATION
+           default: "nearest"
+
+    Returns
+    -------
+    GeoArray
+
+    Purpose
+    -------
+    Change the cellsize of source by scaling_factor. Integer factors together
+    with one of the methods in _AGGREGATION ("mean" being an alias of "average")
+    aggregate blocks of scaling_factor x scaling_factor cells in NumPy,
+    ignoring the masked cells. Blocks at the lower and right border not
+    covered completely are dropped. Nearest neighbour refinements by
+    integer factors (i.e. 1/scaling_factor) are done by upsample.
+    """
+
+    if func in _AGGREGATION and _isInteger(scaling_factor):
+        return _rescaleBlocks(source, int(scaling_factor), func)
+
+    if func == "nearest" and _isInteger(1. / scaling_factor):
+        return upsample(source, int(round(1. / scaling_factor)))
+
+    if func not in _RESAMPLING:
+        raise TypeError("Argument 'func' must be one of '{:}' or '{:}' for integer scaling factors".format(
+            tuple(_RESAMPLING), _AGGREGATION)
+        )
+
+    scaled_gridsize = (int(source.shape[-2] // scaling_factor),
+                       int(source.shape[-1] // scaling_factor))
     scaled_cellsize = (source.cellsize[-2] * scaling_factor,
                        source.cellsize[-1] * scaling_factor)
-    scaled_grid = full(scaled_gridsize, source.fill_value,
-                       xorigin=source.xorigin, yorigin=source.yorigin,
-                       cellsize=scaled_cellsize, dtype=source.dtype)
+    scaled_grid = ga.full(scaled_gridsize, source.fill_value,
+                          xorigin=source.xorigin, yorigin=source.yorigin,
+                          origin=source.origin, proj=source.proj,
+                          cellsize=scaled_cellsize, dtype=source.dtype)
     return resample(source, scaled_grid, func=func)
+
+def _rescaleBlocks(source, factor, func):
+
+    nrows, ncols = source.nrows // factor, source.ncols // factor
+    # georeferencing of the covered part of source
+    grid = source[..., :nrows*factor, :ncols*factor]
+
+    bshape = grid.shape[:-2] + (nrows, factor, ncols, factor)
+    values, mask = _blockAggregate(
+        np.ma.getdata(grid).reshape(bshape),
+        np.ma.getmaskarray(grid).reshape(bshape),
+        func
+    )
+
+    fill_value = None if func == "count" else source.fill_value
+    if fill_value is not None:
+        values = np.where(mask, fill_value, values)
+
+    out = ga.array(
+        data       = values,
+        fill_value = fill_value,
+        yorigin    = grid.yorigin,
+        xorigin    = grid.xorigin,
+        origin     = grid.origin,
+        cellsize   = tuple(c * factor for c in grid.cellsize),
+        proj       = grid.proj,
+        mode       = grid.mode,
+    )
+    if fill_value is None and mask.any():
+        out.mask = mask
+    return out
+
+def upsample(source, factor, view=False):
+    """
+    Arguments
+    ---------
+    source : GeoArray  # grid to refine
+    factor : int       # number of target cells per source cell along each axis
+
+    Optional Arguments
+    ------------------
+    view : bool  # return a read-only view instead of a new grid
+           default: False
+
+    Returns
+    -------
+    GeoArray / (numpy.ma.MaskedArray, dict)
+
+    Purpose
+    -------
+    Refine source by the integer factor using nearest neighbour resampling.
+
+    With view=True no data is copied. A read-only masked array of shape
+    source.shape[:-2] + (nrows, factor, ncols, factor) is returned together
+    with the header of the refined grid (see GeoArray.header). As the
+    repetition of cells cannot be expressed by the strides of a two dimensional
+    array, the view broadcasts against the blocks of a grid with the target
+    geometry, e.g.
+
+        fine.reshape(fine.shape[:-2] + (nrows, factor, ncols, factor))
+
+    which is itself a view. Reshaping the view to the target shape materializes
+    the refined grid:
+
+        view, header = upsample(grid, factor, view=True)
+        fine = ga.array(view.reshape(shape), **header)
+
+    with shape = grid.shape[:-2] + (nrows*factor, ncols*factor). See combine
+    to apply operations between a fine and a coarse grid directly.
+    """
+
+    if not _isInteger(factor):
+        raise TypeError("Argument 'factor' must be a positive integer")
+    factor = int(factor)
+
+    nrows, ncols = source.nrows, source.ncols
+    bshape = source.shape[:-2]
+
+    # georeferencing is independent from the origin convention
+    header = source.header
+    header["cellsize"] = tuple(float(c) / factor for c in source.cellsize)
+
+    if view:
+        shape = bshape + (nrows, factor, ncols, factor)
+        data = np.broadcast_to(np.ma.getdata(source)[..., :, None, :, None], shape)
+        mask = np.ma.getmask(source)
+        if mask is not np.ma.nomask:
+            mask = np.broadcast_to(mask[..., :, None, :, None], shape)
+        out = np.ma.array(data, mask=mask, copy=False, fill_value=source.fill_value)
+        out.flags.writeable = False
+        return out, header
+
+    data = np.repeat(np.repeat(np.ma.getdata(source), factor, axis=-2), factor, axis=-1)
+
+    out = ga.array(data=data, **header)
+    if source.fill_value is None and np.ma.getmask(source) is not np.ma.nomask:
+        out.mask = np.repeat(np.repeat(source.mask, factor, axis=-2), factor, axis=-1)
+    return out
+
+def combine(fine, coarse, func):
+    """
+    Arguments
+    ---------
+    fine   : GeoArray  # grid with a cellsize of an integer fraction of coarse's cellsize
+    coarse : GeoArray  # grid covering the same domain as fine
+    func   : callable  # binary function of two masked arrays, e.g. numpy.add
+
+    Returns
+    -------
+    GeoArray
+
+    Purpose
+    -------
+    Return func(fine, upsample(coarse, factor)) without materializing the
+    refined coarse grid. The fine grid is viewed in blocks of shape
+    (nrows, yfactor, ncols, xfactor), which broadcast against the coarse
+    grid (see upsample). The result shares the geometry and fill_value of fine.
+    """
+
+    factors = []
+    for fcs, ccs in zip(fine.cellsize, coarse.cellsize):
+        factor = ccs / float(fcs)
+        if round(factor) < 1 or abs(factor - round(factor)) > 1e-6:
+            raise ValueError(
+                "The cellsizes of coarse need to be positive integer multiples of fine's cellsizes"
+            )
+        factors.append(int(round(factor)))
+    yfactor, xfactor = factors
+
+    nrows, ncols = coarse.nrows, coarse.ncols
+    if (fine.nrows, fine.ncols) != (nrows * yfactor, ncols * xfactor):
+        raise ValueError("Grids do not cover the same domain")
+    if not np.allclose(fine.getOrigin("ul"), coarse.getOrigin("ul")):
+        raise ValueError("Incompatible origins")
+    if fine._proj != coarse._proj:
+        warnings.warn("Incompatible map projections!", RuntimeWarning)
+
+    blocks = fine.shape[:-2] + (nrows, yfactor, ncols, xfactor)
+    values = func(
+        np.ma.array(np.ma.getdata(fine), mask=np.ma.getmaskarray(fine)).reshape(blocks),
+        np.ma.array(np.ma.getdata(coarse), mask=np.ma.getmaskarray(coarse))[..., :, None, :, None]
+    )
+    shape = values.shape[:-4] + (fine.nrows, fine.ncols)
+    fill_value = fine.fill_value
+
+    out = ga.array(
+        data       = np.ma.filled(values, 0 if fill_value is None else fill_value).reshape(shape),
+        fill_value = fill_value,
+        yorigin    = fine.yorigin,
+        xorigin    = fine.xorigin,
+        origin     = fine.origin,
+        cellsize   = fine.cellsize,
+        proj       = fine.proj,
+        mode       = fine.mode,
+    )
+    mask = np.ma.getmaskarray(values).reshape(shape)
+    if fill_value is None and mask.any():
+        out.mask = mask
+    return out
@@ -3,9 +3,14 @@
 
 import os
 import warnings
+import threading
+import weakref
 import numpy as np
+from collections import OrderedDict
+from math import floor, ceil
 import gdal, osr
 from .gdaltrans import _Projection
+from .utils import _blockWindows
 
 gdal.UseExceptions()
 gdal.PushErrorHandler('CPLQuietErrorHandler')
@@ -20,6 +25,56 @@ _DRIVER_DICT = {
     ".png" : "PNG", # not working properly
 }
 
+def _pair(value):
+    try:
+        return tuple(value)
+    except TypeError:
+        return (value, value)
+
+# Translation of the tofile options into driver creation options,
+# for available options see the driver pages linked from:
+# http://www.gdal.org/formats_list.html
+_CREATION_OPTIONS = {
+    "GTiff" : {
+        "tiled"       : lambda v: ["TILED={:}".format("YES" if v else "NO")],
+        "blocksize"   : lambda v: ["BLOCKYSIZE={:}".format(_pair(v)[0]),
+                                   "BLOCKXSIZE={:}".format(_pair(v)[1])],
+        "compress"    : lambda v: ["COMPRESS={:}".format(str(v).upper())],
+        "predictor"   : lambda v: ["PREDICTOR={:}".format(v)],
+        "bigtiff"     : lambda v: ["BIGTIFF={:}".format(str(v).upper())],
+        "num_threads" : lambda v: ["NUM_THREADS={:}".format(str(v).upper())],
+    },
+    "COG" : {
+        "blocksize"   : lambda v: ["BLOCKSIZE={:}".format(_pair(v)[0])],
+        "compress"    : lambda v: ["COMPRESS={:}".format(str(v).upper())],
+        "predictor"   : lambda v: ["PREDICTOR={:}".format(
+            {2: "STANDARD", 3: "FLOATING_POINT"}.get(v, str(v).upper()))],
+        "bigtiff"     : lambda v: ["BIGTIFF={:}".format(str(v).upper())],
+        "num_threads" : lambda v: ["NUM_THREADS={:}".format(str(v).upper())],
+        "resampling"  : lambda v: ["RESAMPLING={:}".format(str(v).upper())],
+    },
+    "HFA" : {
+        "blocksize"   : lambda v: ["BLOCKSIZE={:}".format(_pair(v)[0])],
+        "compress"    : lambda v: ["COMPRESSED={:}".format(
+            "NO" if str(v).upper() in ("FALSE", "NONE", "NO") else "YES")],
+    },
+}
+
+# Default values of the tofile options
+_CREATION_DEFAULTS = {
+    "GTiff" : {
+        "tiled"       : True,
+        "blocksize"   : 256,
+        "compress"    : "deflate",
+        "bigtiff"     : "if_needed",
+    },
+    "COG" : {
+        "blocksize"   : 512,
+        "compress"    : "deflate",
+        "bigtiff"     : "if_needed",
+    },
+}
+
 # type mapping:
 #     - there is no boolean data type in GDAL
 _TYPEMAP = {
@@ -65,50 +120,444 @@ _COLOR_DICT = {
     16 : "Cr",
 }
 
+# Maximum number of cells passed to gdal in one write call
+_CHUNKSIZE = 2**22
+
+# Access modes of fromfile
+_ACCESS = {
+    "r"  : gdal.GA_ReadOnly,
+    "r+" : gdal.GA_Update,
+}
+
+# Default maximum number of pooled dataset handles, see setPoolSize
+_POOLSIZE = 128
+
+
+def _open(fname, mode="r"):
+    """
+    Open fname with the given access mode, bypassing the pool
+    """
+
+    try:
+        fobj = gdal.Open(fname, _ACCESS[mode])
+    except RuntimeError:
+        fobj = None
+    if not fobj:
+        raise IOError("Could not open file: {:}".format(fname))
+    return fobj
+
+
+class _DatasetPool(object):
+    def __init__(self, maxsize=_POOLSIZE):
+        """
+        Arguments
+        ---------
+        maxsize : int  # maximum number of open handles
+
+        Purpose
+        -------
+        Thread-safe LRU cache of gdal.Dataset handles keyed by the file
+        path, the access mode and the opening thread, i.e. handles are
+        never shared between threads. Pooled handles must not leave the
+        reading function, the returned GeoArrays get their own handles
+        (see _fromFile). Handles of finished threads are dropped, evicted
+        handles are closed as soon as nothing refers to them anymore.
+        """
+        self.maxsize = maxsize
+        self._handles = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(fname, mode):
+        # thread idents are reused, the thread objects are not
+        return (os.path.abspath(fname), mode, threading.current_thread())
+
+    def open(self, fname, mode="r"):
+        if mode not in _ACCESS:
+            raise TypeError("Argument 'mode' must be one of '{:}'".format(tuple(_ACCESS)))
+
+        key = self._key(fname, mode)
+        with self._lock:
+            fobj = self._handles.pop(key, None)
+            if fobj is not None:
+                self._handles[key] = fobj
+                return fobj
+
+        # opening might be slow, don't block the other threads
+        fobj = _open(fname, mode)
+
+        with self._lock:
+            self._handles[key] = fobj
+            self._evict(self.maxsize)
+        return fobj
+
+    def _evict(self, maxsize):
+        # drop the handles of finished threads and the least recently
+        # used handles, the lock needs to be held
+        for key in [k for k in self._handles if not k[2].is_alive()]:
+            del self._handles[key]
+        while len(self._handles) > max(maxsize, 0):
+            self._handles.popitem(last=False)
+
+    def resize(self, maxsize):
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict(maxsize)
+
+    def invalidate(self, fname):
+        # drop all handles of fname, i.e. after the file was (re)written
+        path = os.path.abspath(fname)
+        with self._lock:
+            for key in [k for k in self._handles if k[0] == path]:
+                del self._handles[key]
+
+
+_DATASETS = _DatasetPool()
+
+def setPoolSize(value):
+    """
+    Arguments
+    ---------
+    value : int
+
+    Returns
+    -------
+    int
+
+    Purpose
+    -------
+    Set the maximum number of dataset handles kept open by fromfile
+    and the other file readers. A value of 0 disables the pooling.
+    Returns the previous setting.
+    """
+
+    out = _DATASETS.maxsize
+    _DATASETS.resize(int(value))
+    return out
+
 _COLOR_MODE_LIST = (
     "L", "P", "RGB", "RGBA", "CMYK", "HSV", "YCbCr"
 )
  
 
-def _fromFile(fname):
+def _fromFile(fname, mode="r", window=None, bands=None, bbox=None, cellsize=None, scale=None,
+              header_only=False):
     """
     Parameters
     ----------
     fname : str  # file name
     
+    Optional Parameters
+    -------------------
+    mode : {"r", "r+"}  # access mode, "r+" returns a writable mapping of the file
+    see _fromDataset for all other parameters
+
     Returns
     -------
     GeoArray
 
     Purpose
     -------
-    Create GeoArray from file
-
+    Create GeoArray from file. Partial reads go through the pooled handles,
+    full mappings of the file are backed by a dedicated handle, as the
+    returned grid might be used by other threads.
     """
-    
-    # fobj = gdal.OpenShared(fname, gdal.GA_Update)
-    fobj = gdal.OpenShared(fname)
-    if fobj:
-        return _fromDataset(fobj)
-    raise IOError("Could not open file: {:}".format(fname))
 
+    full = (
+        window is None and bands is None and bbox is None and cellsize is None
+        and scale is None and not header_only
+    )
+    return _fromDataset(
+        _open(fname, mode) if full else _DATASETS.open(fname, mode),
+        window=window, bands=bands, bbox=bbox, cellsize=cellsize, scale=scale,
+        writeable=(mode == "r+"), header_only=header_only
+    )
+
+
+def _bandDtype(band):
+    # GDAL's Byte is unsigned, in contrast to _TYPEMAP[1]
+    if band.DataType == gdal.GDT_Byte:
+        return np.dtype(np.uint8)
+    try:
+        return np.dtype(_TYPEMAP[band.DataType])
+    except KeyError:
+        return None
 
-def _getColorMode(fobj):
+
+def _getColorMode(fobj, bands=None):
+    if bands is None:
+        bands = range(fobj.RasterCount)
     tmp = []
-    for i in range(fobj.RasterCount):
+    for i in bands:
         color = fobj.GetRasterBand(i+1).GetColorInterpretation() 
         tmp.append(_COLOR_DICT.get(color, "L"))
     return ''.join(sorted(set(tmp), key=tmp.index))
 
 
-def _fromDataset(fobj):
-    
-    from .wrapper import array
+def _bboxWindow(fobj, bbox):
+    """
+    Parameters
+    ----------
+    fobj : gdal.Dataset
+    bbox : dict           # {"ymin", "ymax", "xmin", "xmax"}, missing
+                          # values default to the dataset's domain
+    Returns
+    -------
+    (int, int, int, int)
+
+    Purpose
+    -------
+    Return the (row, col, nrows, ncols) window of all cells of the
+    (north-up) dataset intersecting the given bbox.
+    """
+
+    geotrans = fobj.GetGeoTransform()
+    yorigin, xorigin = geotrans[3], geotrans[0]
+    ycellsize, xcellsize = float(abs(geotrans[5])), float(abs(geotrans[1]))
+
+    top    = floor((yorigin - bbox.get("ymax", yorigin))/ycellsize)
+    left   = floor((bbox.get("xmin", xorigin) - xorigin)/xcellsize)
+    bottom = ceil((yorigin - bbox.get("ymin", yorigin - fobj.RasterYSize*ycellsize))/ycellsize)
+    right  = ceil((bbox.get("xmax", xorigin + fobj.RasterXSize*xcellsize) - xorigin)/xcellsize)
+
+    top, left = int(max(top, 0)), int(max(left, 0))
+    bottom, right = int(min(bottom, fobj.RasterYSize)), int(min(right, fobj.RasterXSize))
+
+    if bottom <= top or right <= left:
+        raise ValueError("Given bbox not within the dataset domain!")
+
+    return top, left, bottom - top, right - left
+
+
+def _bufferShape(fobj, window, cellsize=None, scale=None):
+    """
+    Return the (nrows, ncols) shape of the output buffer needed to
+    read the given window at the resolution defined by either a target
+    cellsize or a scaling factor (i.e. a multiple of the dataset's cellsize).
+    """
+
+    if cellsize is not None and scale is not None:
+        raise TypeError("Arguments 'cellsize' and 'scale' are mutually exclusive")
+
+    nrows, ncols = window[2:]
+    if cellsize is None and scale is None:
+        return nrows, ncols
+
+    if cellsize is not None:
+        geotrans = fobj.GetGeoTransform()
+        try:
+            ycellsize, xcellsize = cellsize
+        except TypeError:
+            ycellsize = xcellsize = cellsize
+        scale = (
+            abs(ycellsize)/float(abs(geotrans[5])),
+            abs(xcellsize)/float(abs(geotrans[1]))
+        )
+
+    try:
+        yscale, xscale = scale
+    except TypeError:
+        yscale = xscale = scale
+
+    return (
+        max(int(round(nrows / float(yscale))), 1),
+        max(int(round(ncols / float(xscale))), 1),
+    )
+
+
+def _checkBands(fobj, bands):
+    """
+    Raise a ValueError, if bands is empty or contains
+    (0-based) band indices not present in fobj
+    """
+
+    if not len(bands):
+        raise ValueError("Argument 'bands' must not be empty")
+    invalid = [b for b in bands if not 0 <= b < fobj.RasterCount]
+    if invalid:
+        raise ValueError(
+            "Band indices {:} not within the {:} band(s) of the dataset".format(
+                invalid, fobj.RasterCount
+            )
+        )
+
+
+def _readWindow(fobj, window, bands, shape=None):
+    """
+    Read the given (row, col, nrows, ncols) window of the given
+    bands into a (nbands, nrows, ncols) array. If shape is given,
+    the window is resampled to the given (nrows, ncols). GDAL
+    uses the dataset's overviews for such decimated reads if present.
+    """
+
+    row, col, nrows, ncols = window
+    if (row < 0 or col < 0 or nrows < 1 or ncols < 1
+        or row + nrows > fobj.RasterYSize or col + ncols > fobj.RasterXSize):
+        raise ValueError("Window not within the dataset domain!")
+    _checkBands(fobj, bands)
+
+    bufrows, bufcols = shape or (nrows, ncols)
+
+    out = None
+    for i, band in enumerate(bands):
+        values = fobj.GetRasterBand(band+1).ReadAsArray(
+            col, row, ncols, nrows, buf_xsize=bufcols, buf_ysize=bufrows
+        )
+        if out is None:
+            out = np.empty((len(bands), bufrows, bufcols), dtype=values.dtype)
+        out[i] = values
+    return out
+
+
+# Live virtual memory mappings of files, see _releaseFile
+_MAPPINGS = weakref.WeakSet()
+_MAPPINGS_LOCK = threading.Lock()
+
+def _fileId(fname):
+    """
+    Return the (device, inode) pair identifying the file fname,
+    None if fname does not exist
+    """
+
+    try:
+        stat = os.stat(fname)
+    except (OSError, TypeError, ValueError):
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+def _releaseFile(fname):
+    """
+    Arguments
+    ---------
+    fname : str  # file name
+
+    Returns
+    -------
+    None
+
+    Purpose
+    -------
+    Prepare fname to be (re)written: the pooled handles of the file are
+    dropped. A file still mapped by GeoArrays is removed before, the
+    mappings keep the content of the removed file. Files mapped for
+    writing (i.e. opened with mode="r+") cannot be replaced, an IOError
+    is raised.
+    """
+
+    _DATASETS.invalidate(fname)
+    fileid = _fileId(fname)
+    if fileid is None:
+        return
+
+    with _MAPPINGS_LOCK:
+        mappings = [m for m in _MAPPINGS if m._fileid == fileid]
+    if not mappings:
+        return
+    if any(m._writeable for m in mappings):
+        raise IOError("File {:} is mapped for writing and cannot be replaced".format(fname))
+    try:
+        os.remove(fname)
+    except OSError:
+        raise IOError("File {:} is mapped and cannot be replaced".format(fname))
+
+
+class _Mapping(object):
+    def __init__(self, fobj, writeable=False):
+        """
+        Arguments
+        ---------
+        fobj      : gdal.Dataset
+        writeable : bool          # map the dataset for writing
+
+        Purpose
+        -------
+        Owner of a virtual memory mapping of fobj. Arrays created with
+        numpy.asarray share the memory of the mapping and keep its owner
+        alive, which in turn keeps the dataset alive. The mapping is
+        therefore always released before the dataset. Mappings of files
+        are registered until released, see _releaseFile.
+        """
+        self._fobj = fobj
+        self._array = fobj.GetVirtualMemArray(gdal.GF_Write if writeable else gdal.GF_Read)
+        self.__array_interface__ = self._array.__array_interface__
+        self._writeable = writeable
+        self._fileid = _fileId(fobj.GetDescription())
+        if self._fileid is not None:
+            with _MAPPINGS_LOCK:
+                _MAPPINGS.add(self)
+
+    def __del__(self):
+        # the virtual memory mapping needs to be released BEFORE the fobj
+        self._array = None
+        self._fobj = None
+
+
+def _isWriteableMapping(data):
+    """
+    Check if data is the writable virtual memory mapping
+    of a dataset created by _fromDataset
+    """
+
+    return isinstance(getattr(data, "base", None), _Mapping) and data.flags.writeable
+
+
+def _mappedDataset(data):
+    """
+    Return the dataset of the virtual memory mapping data,
+    see _isWriteableMapping
+    """
+
+    return data.base._fobj
+
+
+def _fromDataset(fobj, window=None, bands=None, bbox=None, cellsize=None, scale=None,
+                 writeable=False, header_only=False):
+    """
+    Parameters
+    ----------
+    fobj : gdal.Dataset
+
+    Optional Parameters
+    -------------------
+    window : (int, int, int, int)  # (row, col, nrows, ncols) of the pixel window to read
+    bands  : list of int           # (0-based) indices of the bands to read
+    bbox   : dict                  # read all cells intersecting the given bbox,
+                                   # see _bboxWindow. Not to be combined with window.
+    cellsize : scalar/(scalar, scalar)  # read at the given (coarser) cellsize
+    scale    : scalar/(scalar, scalar)  # read at the given multiple of the dataset's
+                                        # cellsize. Not to be combined with cellsize.
+    writeable : bool                    # return a writable mapping, fobj needs to be
+                                        # opened in update mode
+    header_only : bool                  # return the shape and dtype instead of the data
+                                        # together with the fill values of all bands
+                                        # and the file name, no pixels are read
+
+    Returns
+    -------
+    dict
+
+    Purpose
+    -------
+    Return the arguments needed to construct a GeoArray from the given dataset.
+    Without any optional parameter the returned data is a virtual memory mapping
+    of the full dataset, otherwise only the requested window and bands are read.
+    Reduced resolution reads use the dataset's overviews if present.
+    """
+
+    if bbox is not None:
+        if window is not None:
+            raise TypeError("Arguments 'bbox' and 'window' are mutually exclusive")
+        window = _bboxWindow(fobj, bbox)
+
+    bandidx = range(fobj.RasterCount) if bands is None else list(bands)
+    if bands is not None:
+        _checkBands(fobj, bandidx)
 
     fill_values = tuple(
-        fobj.GetRasterBand(i+1).GetNoDataValue() for i in range(fobj.RasterCount)
+        fobj.GetRasterBand(i+1).GetNoDataValue() for i in bandidx
     )
-    if len(set(fill_values)) > 1:
+    if len(set(fill_values)) > 1 and not header_only:
         warnings.warn(
             "More then on fill value found. Only {:} will be used".format(fill_values[0]),
             RuntimeWarning
@@ -116,57 +565,440 @@ def _fromDataset(fobj):
     
     geotrans   = fobj.GetGeoTransform()
 
-    return {
-        "data"       : fobj.GetVirtualMemArray(),
-        "yorigin"    : geotrans[3],
-        "xorigin"    : geotrans[0],
+    full = window is None and bands is None and cellsize is None and scale is None
+    if writeable and not full:
+        raise TypeError("Only the full dataset can be mapped for writing")
+
+    window = window or (0, 0, fobj.RasterYSize, fobj.RasterXSize)
+    row, col = window[:2]
+    shape = _bufferShape(fobj, window, cellsize, scale)
+    yscale, xscale = window[2]/float(shape[0]), window[3]/float(shape[1])
+    if bands is not None or fobj.RasterCount > 1:
+        shape = (len(bandidx),) + tuple(shape)
+
+    out = {
+        "yorigin"    : geotrans[3] + row * geotrans[5],
+        "xorigin"    : geotrans[0] + col * geotrans[1],
         "origin"     : "ul",
         "fill_value" : fill_values[0],
-        "cellsize"   : (geotrans[5], geotrans[1]),
+        "cellsize"   : (geotrans[5] * yscale, geotrans[1] * xscale),
         "proj"       : _Projection(fobj.GetProjection()),
-        "mode"       : _getColorMode(fobj),
-        "fobj"       : fobj,
+        "mode"       : _getColorMode(fobj, bandidx),
     }
 
+    if header_only:
+        out["shape"]       = tuple(shape)
+        out["dtype"]       = _bandDtype(fobj.GetRasterBand(bandidx[0]+1))
+        out["fill_values"] = fill_values
+        out["fname"]       = fobj.GetDescription()
+    elif full:
+        out["data"], out["fobj"] = np.asarray(_Mapping(fobj, writeable)), fobj
+    else:
+        data = _readWindow(fobj, window, bandidx, shape[-2:])
+        # the data is not backed by the dataset
+        out["data"], out["fobj"] = data.reshape(shape), None
+
+    return out
+
+
+def _blockSize(fobj):
+    """
+    Return the native (nrows, ncols) block size of the dataset
+    """
+    xsize, ysize = fobj.GetRasterBand(1).GetBlockSize()
+    return ysize, xsize
+
+
+def _isFileBacked(fobj):
+    """
+    Check if the dataset fobj is backed by a file, i.e. is not an
+    in-memory dataset (the MEM driver uses single scanline blocks)
+    """
+
+    return bool(fobj.GetDescription()) and fobj.GetDriver().ShortName != "MEM"
+
+
+def _iterBlocks(fname, halo=0, bands=None, pooled=True):
+    """
+    Parameters
+    ----------
+    fname  : str          # file name
+    halo   : int          # number of cells to extend the blocks at each side
+    bands  : list of int  # (0-based) indices of the bands to read
+    pooled : bool         # read through the pooled handle of the calling thread,
+                          # otherwise through a dedicated handle. The latter is
+                          # needed, if the generator is advanced by different threads.
+
+    Returns
+    -------
+    generator of (dict, (int, int, int, int))
+
+    Purpose
+    -------
+    Yield the arguments needed to construct a GeoArray of each
+    block of the native block layout of the given file together
+    with the (top, left, bottom, right) widths of the halo.
+    """
+
+    fobj = _DATASETS.open(fname) if pooled else _open(fname)
+
+    shape = (fobj.RasterYSize, fobj.RasterXSize)
+    for window, halo_widths in _blockWindows(shape, _blockSize(fobj), halo):
+        yield _fromDataset(fobj, window=window, bands=bands), halo_widths
+
+
+def _supportsCreate(driver, dtype):
+    """
+    Check if the driver is able to directly create datasets of the given type
+    """
+
+    metadata = driver.GetMetadata_Dict()
+    try:
+        tname = gdal.GetDataTypeName(_TYPEMAP[str(dtype)])
+    except KeyError:
+        return False
+    return (
+        metadata.get("DCAP_CREATE") == "YES"
+        and tname in metadata.get("DMD_CREATIONDATATYPES", "").split(" ")
+    )
+
+
+def _creationOptions(driver, options):
+    """
+    Parameters
+    ----------
+    driver  : gdal.Driver
+    options : dict         # tofile options, None values fall back to the defaults
+
+    Returns
+    -------
+    list of str
+
+    Purpose
+    -------
+    Translate the given options into creation options of the given driver.
+    """
+
+    name = driver.ShortName
+    values = dict(_CREATION_DEFAULTS.get(name, {}))
+    values.update((k, v) for k, v in (options or {}).items() if v is not None)
+
+    out = []
+    for key, value in sorted(values.items()):
+        try:
+            out.extend(_CREATION_OPTIONS[name][key](value))
+        except KeyError:
+            warnings.warn(
+                "Option '{:}' not supported by driver {:}".format(key, name),
+                RuntimeWarning
+            )
+    return out
+
+
+def _createDataset(fname, shape, dtype, geotrans, proj, fill_value, options=None):
+    """
+    Parameters
+    ----------
+    fname      : str                  # file name
+    shape      : (int, int, int)      # (nbands, nrows, ncols)
+    dtype      : np.dtype
+    geotrans   : tuple                # gdal geotransform
+    proj       : str/None             # WKT projection
+    fill_value : scalar/None
+    options    : dict                 # tofile options, see _creationOptions
+
+    Returns
+    -------
+    gdal.Dataset
+
+    Purpose
+    -------
+    Create the file fname (without copying any data).
+    """
+
+    driver = _getDriver(_fnameExtension(fname))
+    if not _supportsCreate(driver, dtype):
+        raise IOError(
+            "Driver {:} does not support direct writing of {:}".format(driver.ShortName, dtype)
+        )
+
+    nbands, nrows, ncols = shape
+    out = driver.Create(
+        fname, ncols, nrows, nbands, _TYPEMAP[str(dtype)],
+        _creationOptions(driver, options)
+    )
+
+    out.SetGeoTransform(geotrans)
+    if proj:
+        out.SetProjection(proj)
+    if fill_value is not None:
+        for n in range(nbands):
+            out.GetRasterBand(n+1).SetNoDataValue(float(fill_value))
+    return out
+
+
+def _writeBlock(fobj, block, halo=(0, 0, 0, 0)):
+    """
+    Write the given GeoArray into the gdal.Dataset fobj. The position
+    is derived from the block's upper left corner, the given
+    (top, left, bottom, right) halo widths are removed before writing.
+    """
+
+    top, left, bottom, right = halo
+    block = block[..., top:block.nrows-bottom, left:block.ncols-right]
+
+    geotrans = fobj.GetGeoTransform()
+    yorigin, xorigin = block.getOrigin("ul")
+    row = int(round((geotrans[3] - yorigin)/abs(geotrans[5])))
+    col = int(round((xorigin - geotrans[0])/abs(geotrans[1])))
+
+    for n in range(block.nbands):
+        fobj.GetRasterBand(n+1).WriteArray(
+            np.ma.getdata(block[n] if block.ndim > 2 else block), col, row
+        )
+
+
+def _writeBlocks(fname, blocks, like=None, options=None):
+    """
+    Parameters
+    ----------
+    fname  : str                       # file name
+    blocks : iterable of GeoArray
+    like   : str/gdal.Dataset/None     # template defining the spatial extent and
+                                       # projection of a newly created file
+    options : dict                     # creation options of a newly created file,
+                                       # see _creationOptions
+
+    Returns
+    -------
+    None
+
+    Purpose
+    -------
+    Write the given blocks into fname. An existing file is updated in place,
+    otherwise a new file is created from like and the first block's datatype,
+    band number and fill value. The halo of blocks yielded by _iterBlocks
+    or GeoArray.blocks is removed.
+    """
+
+    fobj = None
+    for block in blocks:
+        if fobj is None:
+            if os.path.exists(fname):
+                fobj = gdal.Open(fname, gdal.GA_Update)
+            elif like is None:
+                raise IOError("File {:} does not exist and no template given".format(fname))
+            else:
+                if not isinstance(like, gdal.Dataset):
+                    like = _DATASETS.open(like)
+                fobj = _createDataset(
+                    fname, (block.nbands, like.RasterYSize, like.RasterXSize), block.dtype,
+                    like.GetGeoTransform(), like.GetProjection(), block.fill_value,
+                    options
+                )
+        _writeBlock(fobj, block, getattr(block, "halo", (0, 0, 0, 0)))
+
+    if fobj is not None:
+        fobj.FlushCache()
+        _DATASETS.invalidate(fname)
+
+
+def _fnameExtension(fname):
+    return os.path.splitext(fname)[-1].lower()
+
+
+def _getDriver(fext):
+    """
+    Guess driver from file name extension
+    """
+    if fext in _DRIVER_DICT:
+        driver = gdal.GetDriverByName(_DRIVER_DICT[fext])
+        metadata = driver.GetMetadata_Dict()
+        if "YES" == metadata.get("DCAP_CREATE", metadata.get("DCAP_CREATECOPY")):
+            return driver
+        raise IOError("Datatype cannot be written")
+    raise IOError("No driver found for filename extension '{:}'".format(fext))
+
+
+def _geoTransform(grid):
+    bbox = grid.bbox
+    return (
+        bbox["xmin"], abs(grid.cellsize[1]), 0,
+        bbox["ymax"], 0, abs(grid.cellsize[0])*-1
+    )
+
+
+def _writeArray(fobj, grid):
+    """
+    Write the data of grid into the gdal.Dataset fobj band by band
+    in chunks of at most _CHUNKSIZE cells.
+    """
+
+    data = np.ma.getdata(grid)
+    for n in range(grid.nbands):
+        band = fobj.GetRasterBand(n+1)
+        values = data[n] if data.ndim > 2 else data
+        blockrows = band.GetBlockSize()[1]
+        rows = max(_CHUNKSIZE // max(grid.ncols * blockrows, 1), 1) * blockrows
+        for row in range(0, grid.nrows, rows):
+            band.WriteArray(values[row:row+rows], 0, row)
+
+
+def _flushDataset(fobj, grid, windows=None):
+    """
+    Write the data of the file-backed grid through the dataset fobj
+    and flush the dataset's caches to disk. If given, only the
+    (row, col, nrows, ncols) windows are written.
+    """
+
+    if windows is None:
+        _writeArray(fobj, grid)
+    else:
+        data = np.ma.getdata(grid)
+        for n in range(grid.nbands):
+            band = fobj.GetRasterBand(n+1)
+            values = data[n] if data.ndim > 2 else data
+            for row, col, nrows, ncols in windows:
+                band.WriteArray(values[row:row+nrows, col:col+ncols], col, row)
+    fobj.FlushCache()
+    if fobj.GetDescription():
+        _DATASETS.invalidate(fobj.GetDescription())
+
+
+def _isSource(fobj, fname):
+    """
+    Check if fname is the file of the dataset fobj
+    """
+
+    description = fobj.GetDescription()
+    return bool(description) and (
+        os.path.abspath(description) == os.path.abspath(fname)
+    )
+
+
+class _MemDataset(object):
+    def __init__(self, fobj, array):
+        """
+        Arguments
+        ---------
+        fobj  : gdal.Dataset  # MEM dataset using the memory of array
+        array : np.ndarray
+
+        Purpose
+        -------
+        Owner of a MEM dataset and the array holding its pixels. The
+        dataset's methods are accessible through the owner, which keeps the
+        array alive as long as the dataset. Functions of the gdal module
+        need the dataset itself, see _rawDataset.
+        """
+        self._fobj = fobj
+        self._array = array
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._fobj, name)
+
+    def __del__(self):
+        # the dataset needs to be released BEFORE its memory
+        self._fobj = None
+        self._array = None
+
+
+def _rawDataset(fobj):
+    """
+    Return the gdal.Dataset of fobj, which might be a _MemDataset
+    """
+
+    return fobj._fobj if isinstance(fobj, _MemDataset) else fobj
+
+
+def _wrapArray(data, gdaltype):
+    """
+    Arguments
+    ---------
+    data     : np.ndarray  # array of shape (nbands, nrows, ncols)
+    gdaltype : int         # GDAL data type code of data
+
+    Returns
+    -------
+    _MemDataset / None
+
+    Purpose
+    -------
+    Return a MEM dataset using the memory of data, i.e. without a copy.
+    The returned owner keeps the array alive as long as the dataset.
+    Returns None, if the memory layout or the data type do not allow
+    to share the buffer.
+    """
+
+    nbands, nrows, ncols = data.shape
+    strides = data.strides if nbands > 1 else data.strides[1:]
+    if (
+        str(data.dtype) == "int8"      # converted to GDAL's Byte on write
+        or not data.dtype.isnative
+        or not data.flags.aligned
+        or not data.flags.writeable    # GDAL might write into the buffer
+        or any(s <= 0 for s in strides)
+    ):
+        return None
+
+    out = gdal.GetDriverByName("MEM").Create("", ncols, nrows, 0, gdaltype)
+    pointer = data.__array_interface__["data"][0]
+    bandoffset, lineoffset, pixeloffset = data.strides
+    for n in range(nbands):
+        out.AddBand(gdaltype, options=[
+            "DATAPOINTER={:d}".format(pointer + n * bandoffset),
+            "PIXELOFFSET={:d}".format(pixeloffset),
+            "LINEOFFSET={:d}".format(lineoffset),
+        ])
+    return _MemDataset(out, data)
+
 
 def _getDataset(grid, mem=False):
     
-    # Returns an gdal memory dataset created from the given grid
+    # Returns an gdal memory dataset created from the given grid. The memory
+    # of the grid is shared if possible, i.e. changes to one affect the other.
+    # Shared datasets are wrapped into a _MemDataset, pass the result through
+    # _rawDataset before handing it to the functions of the gdal module.
     
     if grid._fobj and not mem:
         return grid._fobj
-    
-    driver = gdal.GetDriverByName("MEM")
-        
+
     try:
-        out = driver.Create(
-            "", grid.ncols, grid.nrows, grid.nbands, _TYPEMAP[str(grid.dtype)]
-        )
+        gdaltype = _TYPEMAP[str(grid.dtype)]
     except KeyError:
         raise RuntimeError("Datatype {:} not supported by GDAL".format(grid.dtype))
 
-    out.SetGeoTransform(
-        (
-            grid.bbox["xmin"], abs(grid.cellsize[1]), 0,
-            grid.bbox["ymax"], 0, abs(grid.cellsize[0])*-1)
-    )
+    data = np.ma.getdata(grid)
+    if data.ndim < 3:
+        data = data[None]
+
+    out = _wrapArray(data, gdaltype)
+    if out is None:
+        out = gdal.GetDriverByName("MEM").Create(
+            "", grid.ncols, grid.nrows, grid.nbands, gdaltype
+        )
+        for n in range(grid.nbands):
+            out.GetRasterBand(n+1).WriteArray(data[n])
+
+    out.SetGeoTransform(_geoTransform(grid))
     if grid.proj:
         out.SetProjection(grid.proj)
 
-    for n in range(grid.nbands):
-        band = out.GetRasterBand(n+1)
-        if grid.fill_value is not None:
-            band.SetNoDataValue(float(grid.fill_value))
-        band.WriteArray(grid[n] if grid.ndim > 2 else grid)
+    if grid.fill_value is not None:
+        for n in range(grid.nbands):
+            out.GetRasterBand(n+1).SetNoDataValue(float(grid.fill_value))
             
     return out
 
 
-def _toFile(geoarray, fname):
+def _toFile(geoarray, fname, options=None):
     """
     Arguments
     ---------
-    fname : str  # file name
+    fname   : str   # file name
+    options : dict  # creation options, see _creationOptions
     
     Returns
     -------
@@ -176,23 +1008,11 @@ def _toFile(geoarray, fname):
     -------
     Write GeoArray to file. The output dataset type is derived from
     the file name extension. See _DRIVER_DICT for implemented formats.
+    Drivers supporting direct writing (e.g. GTiff, HFA, SAGA) create the
+    file and the data is written in chunks. All other drivers (e.g. AAIGrid,
+    PNG) copy from an in-memory dataset.
     """
  
-    def _fnameExtension(fname):
-        return os.path.splitext(fname)[-1].lower()
-
-    def _getDriver(fext):
-        """
-        Guess driver from file name extension
-        """
-        if fext in _DRIVER_DICT:
-            driver = gdal.GetDriverByName(_DRIVER_DICT[fext])
-            metadata = driver.GetMetadata_Dict()
-            if "YES" == metadata.get("DCAP_CREATE", metadata.get("DCAP_CREATECOPY")):
-                return driver
-            raise IOError("Datatype cannot be written")
-        raise IOError("No driver found for filename extension '{:}'".format(fext))
-
     def _getDatatype(driver):
         tnames = tuple(driver.GetMetadata_Dict()["DMD_CREATIONDATATYPES"].split(" "))
         types  = tuple(gdal.GetDataTypeByName(t) for t in tnames)
@@ -200,7 +1020,82 @@ def _toFile(geoarray, fname):
         otype  = max(tdict, key=lambda x: x[0])[-1]
         return np.dtype(_TYPEMAP[otype])
         
-    dataset = _getDataset(geoarray)
+    # pooled handles would read the replaced file
+    _releaseFile(fname)
+
     driver  = _getDriver(_fnameExtension(fname))
-    driver.CreateCopy(fname, dataset, 0)
+    if _supportsCreate(driver, geoarray.dtype):
+        out = _createDataset(
+            fname, (geoarray.nbands, geoarray.nrows, geoarray.ncols), geoarray.dtype,
+            _geoTransform(geoarray), geoarray.proj, geoarray.fill_value, options
+        )
+        _writeArray(out, geoarray)
+        out.FlushCache()
+    else:
+        dataset = _getDataset(geoarray)
+        driver.CreateCopy(fname, _rawDataset(dataset), 0, _creationOptions(driver, options))
+
+
+def _overviewLevels(nrows, ncols, blocksize):
+    """
+    Return the decimation factors needed until the grid fits into one block
+    """
+    out, factor = [], 2
+    while max(nrows, ncols) / float(factor // 2) > blocksize:
+        out.append(factor)
+        factor *= 2
+    return out
+
+
+def _toCog(geoarray, fname, options=None, resampling="nearest"):
+    """
+    Arguments
+    ---------
+    fname      : str   # file name
+    options    : dict  # creation options, see _creationOptions
+    resampling : str   # overview resampling method, one of gdalfuncs._RESAMPLING
+
+    Returns
+    -------
+    None
+
+    Purpose
+    -------
+    Write GeoArray to a cloud optimized GeoTIFF, i.e. a tiled file with
+    internal overviews and the tiles of the coarsest overview first.
+    Uses the COG driver if available (GDAL >= 3.1), otherwise the
+    overviews are build in memory and copied into a tiled GeoTIFF.
+    """
+
+    from .gdalfuncs import _RESAMPLING
+
+    if resampling not in _RESAMPLING:
+        raise TypeError("Argument 'resampling' must be one of '{:}'".format(tuple(_RESAMPLING)))
+    if _DRIVER_DICT.get(_fnameExtension(fname)) != "GTiff":
+        raise IOError("Cloud optimized GeoTIFFs need the file name extension '.tif'")
+
+    _releaseFile(fname)
+
+    options = dict(options or {})
+    driver = gdal.GetDriverByName("COG")
+    if driver is not None:
+        options["resampling"] = resampling
+        driver.CreateCopy(
+            fname, _rawDataset(_getDataset(geoarray)), 0, _creationOptions(driver, options)
+        )
+        return
+
+    driver = gdal.GetDriverByName("GTiff")
+    options["tiled"] = True
+    blocksize = _pair(options.get("blocksize") or _CREATION_DEFAULTS["GTiff"]["blocksize"])
+
+    dataset = _getDataset(geoarray, mem=True)
+    levels = _overviewLevels(geoarray.nrows, geoarray.ncols, max(blocksize))
+    if levels:
+        dataset.BuildOverviews(resampling.upper(), levels)
+
+    driver.CreateCopy(
+        fname, _rawDataset(dataset), 0,
+        _creationOptions(driver, options) + ["COPY_SRC_OVERVIEWS=YES"]
+    )
 
@@ -2,11 +2,73 @@
 # -*- coding: utf-8 -*-
 
 import gdal, osr
+import numpy as np
+import threading
 import warnings
 
 gdal.UseExceptions()
 gdal.PushErrorHandler('CPLQuietErrorHandler')
 
+# Process-wide registry of spatial references. Projection definitions
+# are mapped to their canonical (i.e. WKT) representation, which in turn
+# is mapped to a single osr.SpatialReference instance shared by all
+# _Projections. The shared instances must not be modified.
+_DEFINITIONS = {}
+_SPATIALREFS = {}
+_REGISTRY_LOCK = threading.Lock()
+
+def _definition(value):
+    """
+    Return a hashable key for the given projection definition
+    """
+    if isinstance(value, int):
+        return ("epsg", "+init=epsg:{:}".format(value))
+    elif isinstance(value, dict):
+        params =  "+{:}".format(" +".join(
+            ["=".join(map(str, pp)) for pp in value.items()])
+        )
+        return ("proj4", params)
+    elif isinstance(value, str):
+        return ("wkt", value)
+    return (None, None)
+
+def _internSpatialReference(value):
+    """
+    Arguments
+    ---------
+    value : see _Projection
+
+    Returns
+    -------
+    (osr.SpatialReference, str/None)
+
+    Purpose
+    -------
+    Return the shared spatial reference and its WKT representation
+    for the given projection definition. Every definition is parsed
+    only once.
+    """
+
+    key = _definition(value)
+    try:
+        return _DEFINITIONS[key]
+    except KeyError:
+        pass
+
+    kind, definition = key
+    srs = osr.SpatialReference()
+    if kind in ("epsg", "proj4"):
+        srs.ImportFromProj4(definition)
+    elif kind == "wkt":
+        srs.ImportFromWkt(definition)
+    wkt = srs.ExportToPrettyWkt() or None
+
+    with _REGISTRY_LOCK:
+        out = _SPATIALREFS.setdefault(wkt, (srs, wkt))
+        _DEFINITIONS[key] = out
+    return out
+
+
 class _Projection(object):
     def __init__(self, arg):
         """
@@ -17,55 +79,145 @@ class _Projection(object):
         3. str  : WKT string
         4. _Projection
         """
-        self._srs = osr.SpatialReference()
         self._import(arg)
-        
+
     def _import(self, value):
         if isinstance(value, _Projection):
-            self._srs = value._srs
-        elif isinstance(value, int):
-            self._srs.ImportFromProj4("+init=epsg:{:}".format(value))
-        elif isinstance(value, dict):
-            params =  "+{:}".format(" +".join(
-                ["=".join(map(str, pp)) for pp in value.items()])
-            )
-            self._srs.ImportFromProj4(params)
-        elif isinstance(value, str):
-            self._srs.ImportFromWkt(value)
+            self._srs, self._wkt = value._srs, value._wkt
+        else:
+            self._srs, self._wkt = _internSpatialReference(value)
 
         if value and self is None:
             warnings.warn("Projection not understood", RuntimeWarning)
 
+        self._fingerprint = hash(self._wkt)
+
     def __nonzero__(self):
         # is a an projection set?
-        return self.get() is not None
-    
+        return self._wkt is not None
+
+    # Python 3
+    __bool__ = __nonzero__
+
+    def __eq__(self, other):
+        # spatial references are interned, equality is identity
+        return isinstance(other, _Projection) and self._srs is other._srs
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return self._fingerprint
+
+    @property
+    def fingerprint(self):
+        """
+        Hashable identity of the projection, equal
+        fingerprints indicate equal projections
+        """
+        return self._fingerprint
+
     def get(self):
-        out = self._srs.ExportToPrettyWkt()
-        return out or None
+        return self._wkt
 
     def set(self, val):
         self._import(val)
-   
+
+# Coordinate transformations, keyed by the WKT representations of the
+# source and target projections. osr.CoordinateTransformation objects are
+# not thread-safe, every thread therefore holds its own instances.
+_TRANSFORMATIONS = threading.local()
+
+# Maximum number of points passed to osr in one call
+_CHUNKSIZE = 2**16
+
+def _coordinateTransformation(sproj, tproj):
+    cache = getattr(_TRANSFORMATIONS, "cache", None)
+    if cache is None:
+        cache = _TRANSFORMATIONS.cache = {}
+    key = (sproj.get(), tproj.get())
+    try:
+        return cache[key]
+    except KeyError:
+        pass
+    # the shared spatial references are only read, not modified
+    with _REGISTRY_LOCK:
+        tx = osr.CoordinateTransformation(sproj._srs, tproj._srs)
+    cache[key] = tx
+    return tx
+
+
 class _Transformer(object):
-    def __init__(self, sproj, tproj):
+    def __init__(self, sproj, tproj, chunksize=_CHUNKSIZE):
         """
         Arguments
         ---------
         sproj, tproj : Projection
-        
+        chunksize    : int         # maximum number of points transformed at once
+
         Purpose
         -------
-        Encapsulates the osr Cordinate Transformation functionality
+        Encapsulates the osr Cordinate Transformation functionality.
+        The osr transformation is looked up on each call, instances
+        can therefore be shared between threads.
         """
-        self._tx = osr.CoordinateTransformation(
-            sproj._srs, tproj._srs
-        )
+        self._sproj, self._tproj = sproj, tproj
+        self._chunksize = chunksize
 
     def __call__(self, y, x):
-        try:
-            xt, yt, _ = self._tx.TransformPoint(x, y)
-        except NotImplementedError:
-            raise AttributeError("Projections not correct or given!")
-        return yt, xt
+        """
+        Arguments
+        ---------
+        y, x : scalar/array of scalar
+
+        Returns
+        -------
+        (scalar, scalar) / (np.ndarray, np.ndarray)
+
+        Purpose
+        -------
+        Transform the given coordinates. Arrays are broadcasted
+        against each other and transformed in chunks.
+        """
+
+        tx = _coordinateTransformation(self._sproj, self._tproj)
+        if np.ndim(y) == 0 and np.ndim(x) == 0:
+            try:
+                xt, yt, _ = tx.TransformPoint(x, y)
+            except NotImplementedError:
+                raise AttributeError("Projections not correct or given!")
+            return yt, xt
+
+        y, x = np.broadcast_arrays(np.asarray(y, dtype=float), np.asarray(x, dtype=float))
+        points = np.column_stack((x.ravel(), y.ravel()))
+        out = np.empty_like(points)
+        for start in range(0, len(points), self._chunksize):
+            chunk = slice(start, start + self._chunksize)
+            try:
+                transformed = tx.TransformPoints(points[chunk].tolist())
+            except NotImplementedError:
+                raise AttributeError("Projections not correct or given!")
+            out[chunk] = np.array(transformed, dtype=float)[:, :2]
+
+        return out[:, 1].reshape(y.shape), out[:, 0].reshape(x.shape)
+
+
+def transform(ycoor, xcoor, sproj, tproj):
+    """
+    Arguments
+    ---------
+    ycoor, xcoor : scalar/array of scalar
+    sproj, tproj : int/dict/str/_Projection  # source/target projection,
+                                             # see _Projection for details
+
+    Returns
+    -------
+    (scalar, scalar) / (np.ndarray, np.ndarray)
+
+    Purpose
+    -------
+    Transform the given coordinates from the source into the
+    target projection.
+    """
 
+    return _Transformer(_Projection(sproj), _Projection(tproj))(ycoor, xcoor)
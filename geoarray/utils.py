@@ -1,6 +1,7 @@
 #! /usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import numbers
 import numpy as np
 
 # def _dtypeInfo(dtype):
@@ -46,5 +47,158 @@ def _broadcastedMeshgrid(*arrays):
         # there should be a solution without transposing...
         out.append(tmp.T)
     return out
-        
- 
+
+
+def _normalizeIndex(slc, shape):
+    """
+    slc: index object as given to __getitem__
+    shape: tuple, shape of the indexed array
+
+    Normalize a basic index (integers, slices, Ellipsis, newaxis) and
+    return a tuple with one (axis, (start, step, count)) entry per output
+    dimension, where axis is the input dimension (None for newaxis), and
+    a dict mapping integer indexed input dimensions to their (positive) index.
+    Returns None for advanced (i.e. fancy/boolean) indices.
+    """
+
+    if not isinstance(slc, tuple):
+        slc = (slc,)
+
+    for s in slc:
+        if s is None or s is Ellipsis or isinstance(s, slice):
+            continue
+        if isinstance(s, (bool, np.bool_)) or not isinstance(s, (numbers.Integral, np.integer)):
+            return None
+
+    ellipsis = [i for i, s in enumerate(slc) if s is Ellipsis]
+    consumed = len([s for s in slc if s is not None and s is not Ellipsis])
+    if consumed > len(shape) or len(ellipsis) > 1:
+        return None
+
+    fill = (slice(None, None, None),) * (len(shape) - consumed)
+    if ellipsis:
+        slc = slc[:ellipsis[0]] + fill + slc[ellipsis[0]+1:]
+    else:
+        slc = slc + fill
+
+    out, fixed = [], {}
+    axis = 0
+    for s in slc:
+        if s is None:
+            out.append((None, (0, 0, 1)))
+            continue
+        if isinstance(s, slice):
+            start, stop, step = s.indices(shape[axis])
+            out.append((axis, (start, step, len(range(start, stop, step)))))
+        else:
+            fixed[axis] = int(s) + shape[axis] if s < 0 else int(s)
+        axis += 1
+
+    return tuple(out), fixed
+
+
+def _indexExtent(slc, shape):
+    """
+    slc: index object as given to __setitem__
+    shape: tuple, shape of the indexed array (ndim >= 2)
+
+    Return the ((rowmin, rowmax), (colmin, colmax)) bounds of the cells
+    addressed by slc along the last two dimensions, None if slc does not
+    address any cell. Advanced indices other than boolean arrays of the
+    full shape return the full extent.
+    """
+
+    if isinstance(slc, np.ndarray) and slc.dtype == bool and slc.shape == tuple(shape):
+        rows, cols = np.nonzero(slc.reshape((-1,) + slc.shape[-2:]).any(axis=0))
+        if not len(rows):
+            return None
+        return (rows.min(), rows.max()), (cols.min(), cols.max())
+
+    index = _normalizeIndex(slc, shape)
+    if index is None:
+        return (0, shape[-2]-1), (0, shape[-1]-1)
+
+    out, fixed = index
+    if any(count == 0 for _, (_, _, count) in out):
+        return None
+
+    bounds = []
+    for axis in (len(shape)-2, len(shape)-1):
+        if axis in fixed:
+            bounds.append((fixed[axis], fixed[axis]))
+            continue
+        start, step, count = [s for a, s in out if a == axis][0]
+        stop = start + (count - 1) * step
+        bounds.append((min(start, stop), max(start, stop)))
+    return tuple(bounds)
+
+
+def _memoryExtent(array, base):
+    """
+    array: np.ndarray sharing the memory of base
+    base: np.ndarray (ndim >= 2) with positive strides decreasing along its axes
+
+    Return the ((rowmin, rowmax), (colmin, colmax)) bounds of the cells of
+    base along its last two dimensions occupied by array, None if array is
+    empty. Returns the full extent, if the elements of array cannot be
+    located in base by their strides.
+    """
+
+    full = (0, base.shape[-2]-1), (0, base.shape[-1]-1)
+    if array.size == 0:
+        return None
+    if array.itemsize != base.itemsize:
+        return full
+
+    offset = (
+        array.__array_interface__["data"][0] - base.__array_interface__["data"][0]
+    )
+    lower = []
+    for stride in base.strides:
+        idx, offset = divmod(offset, stride)
+        lower.append(idx)
+    if offset:
+        return full
+    upper = list(lower)
+
+    # express the strides of array as steps along the axes of base
+    for count, stride in zip(array.shape, array.strides):
+        for axis, bstride in enumerate(base.strides):
+            step = int(round(float(stride) / bstride))
+            stride -= step * bstride
+            if step > 0:
+                upper[axis] += step * (count - 1)
+            else:
+                lower[axis] += step * (count - 1)
+        if stride:
+            return full
+
+    if any(lo < 0 or up >= n for lo, up, n in zip(lower, upper, base.shape)):
+        return full
+    return (lower[-2], upper[-2]), (lower[-1], upper[-1])
+
+
+def _blockWindows(shape, blocksize, halo=0):
+    """
+    shape: (nrows, ncols) of the grid
+    blocksize: (nrows, ncols) of the blocks
+    halo: int, number of cells to extend the blocks at each side
+
+    Yield the (row, col, nrows, ncols) windows of the blocks covering
+    the grid, extended by halo cells, and the (top, left, bottom, right)
+    widths of the halo. The halo is truncated at the grid's border.
+    """
+
+    nrows, ncols = shape
+    brows, bcols = blocksize
+    for row in range(0, nrows, brows):
+        rend = min(row + brows, nrows)
+        top, bottom = min(halo, row), min(halo, nrows - rend)
+        for col in range(0, ncols, bcols):
+            cend = min(col + bcols, ncols)
+            left, right = min(halo, col), min(halo, ncols - cend)
+            yield (
+                (row - top, col - left, rend - row + top + bottom, cend - col + left + right),
+                (top, left, bottom, right)
+            )
+
@@ -12,8 +12,13 @@ This module provides initializer function for core.GeoArray
 """
 
 import numpy as np
-from .core import GeoArray
-from .gdalio import _fromFile, _fromDataset
+from .core import GeoArray, GeoInfo
+try:
+    # Python 2 needs the 'futures' backport
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+except ImportError:
+    ThreadPoolExecutor = None
+from .gdalio import _fromFile, _fromDataset, _iterBlocks, _writeBlocks
 # from typing import Optional, Union, Tuple, Any, Mapping, AnyStr
 
 
@@ -28,6 +33,7 @@ def array(data,               # type: Union[np.ndarray, GeoArray]
           mode       = None,  # type: AnyStr
           copy       = False, # type: bool
           fobj       = None,  # type: Optional[osgeo.gdal.Dataset]
+          lazy_mask  = False, # type: bool
 ):                            # type: (...) -> GeoArray
     """
     Arguments
@@ -48,6 +54,7 @@ def array(data,               # type: Union[np.ndarray, GeoArray]
     cellsize     : int/float or 2-tuple of those # cellsize, cellsizes in y and x direction
     proj         : dict/None                     # proj4 projection parameters
     copy         : bool                          # create a copy of the given data
+    lazy_mask    : bool                          # defer the mask computation to its first access
     
     Returns
     -------
@@ -67,8 +74,9 @@ def array(data,               # type: Union[np.ndarray, GeoArray]
         cellsize   = cellsize or data.cellsize
         proj       = proj or data.proj
         mode       = mode or data.mode
+        lazy_mask  = lazy_mask or data.lazy_mask
         fobj       = data.fobj
-        data       = data.data
+        data       = np.ma.getdata(data)
         
     return GeoArray(
         data       = np.array(data, dtype=dtype, copy=copy), 
@@ -80,6 +88,7 @@ def array(data,               # type: Union[np.ndarray, GeoArray]
         proj       = proj,
         mode       = mode,
         fobj       = fobj,
+        lazy_mask  = lazy_mask,
     )
 
 
@@ -94,6 +103,7 @@ def _likeArgs(arr):
         out["cellsize"]   = arr.cellsize
         out["proj"]       = arr.proj
         out["mode"]       = arr.mode
+        out["lazy_mask"]  = arr.lazy_mask
 
     return out
     
@@ -114,7 +124,7 @@ def full_like(arr, value, dtype=None):
 
 
 def zeros(shape, dtype=np.float64, yorigin=0, xorigin=0, origin="ul",
-          fill_value=None, cellsize=1, proj=None, mode=None):
+          fill_value=None, cellsize=1, proj=None, mode=None, lazy_mask=False):
     """
     Arguments
     ---------
@@ -133,6 +143,7 @@ def zeros(shape, dtype=np.float64, yorigin=0, xorigin=0, origin="ul",
     fill_value   : inf/float                     # fill or fill value
     cellsize     : int/float or 2-tuple of those # cellsize, cellsizes in y and x direction
     proj         : dict/None                     # proj4 projection parameters
+    lazy_mask    : bool                          # defer the mask computation to its first access
 
     Returns
     -------
@@ -152,11 +163,12 @@ def zeros(shape, dtype=np.float64, yorigin=0, xorigin=0, origin="ul",
         cellsize   = cellsize,
         proj       = proj,
         mode       = mode,
+        lazy_mask  = lazy_mask,
     )
 
 
 def ones(shape, dtype=np.float64, yorigin=0, xorigin=0, origin="ul",
-         fill_value=None, cellsize=1, proj=None, mode=None):
+         fill_value=None, cellsize=1, proj=None, mode=None, lazy_mask=False):
     """
     Arguments
     ---------
@@ -171,6 +183,7 @@ def ones(shape, dtype=np.float64, yorigin=0, xorigin=0, origin="ul",
     fill_value   : inf/float                     # fill or fill value
     cellsize     : int/float or 2-tuple of those # cellsize, cellsizes in y and x direction
     proj         : dict/None                     # proj4 projection parameters
+    lazy_mask    : bool                          # defer the mask computation to its first access
 
     Returns
     -------
@@ -190,11 +203,12 @@ def ones(shape, dtype=np.float64, yorigin=0, xorigin=0, origin="ul",
         cellsize   = cellsize,
         proj       = proj,
         mode       = mode,
+        lazy_mask  = lazy_mask,
     )
 
 
 def full(shape, value, dtype=np.float64, yorigin=0, xorigin=0, origin="ul",
-         fill_value=None, cellsize=1, proj=None, mode=None):
+         fill_value=None, cellsize=1, proj=None, mode=None, lazy_mask=False):
     """
     Arguments
     ---------
@@ -210,6 +224,7 @@ def full(shape, value, dtype=np.float64, yorigin=0, xorigin=0, origin="ul",
     fill_value   : inf/float                     # fill or fill value
     cellsize     : int/float or 2-tuple of those # cellsize, cellsizes in y and x direction
     proj         : dict/None                     # proj4 projection parameters
+    lazy_mask    : bool                          # defer the mask computation to its first access
 
     Returns
     -------
@@ -229,11 +244,12 @@ def full(shape, value, dtype=np.float64, yorigin=0, xorigin=0, origin="ul",
         cellsize   = cellsize,
         proj       = proj,
         mode       = mode,
+        lazy_mask  = lazy_mask,
     )
 
 
 def empty(shape, dtype=np.float64, yorigin=0, xorigin=0, origin="ul",
-          fill_value=None, cellsize=1, proj=None, mode=None):
+          fill_value=None, cellsize=1, proj=None, mode=None, lazy_mask=False):
     """
     Arguments
     ----------
@@ -248,6 +264,7 @@ def empty(shape, dtype=np.float64, yorigin=0, xorigin=0, origin="ul",
     fill_value   : inf/float                     # fill or fill value
     cellsize     : int/float or 2-tuple of those # cellsize, cellsizes in y and x direction
     proj         : dict/None                     # proj4 projection parameters
+    lazy_mask    : bool                          # defer the mask computation to its first access
 
     Returns
     -------
@@ -267,28 +284,243 @@ def empty(shape, dtype=np.float64, yorigin=0, xorigin=0, origin="ul",
         cellsize   = cellsize,
         proj       = proj,
         mode       = mode,
+        lazy_mask  = lazy_mask,
     )
 
 
-def fromdataset(ds):
-    return array(**_fromDataset(ds))
+def fromdataset(ds, lazy_mask=False, bbox=None, window=None, bands=None,
+                cellsize=None, scale=None):
+    """
+    Arguments
+    ---------
+    ds : gdal.Dataset
+
+    Optional Arguments
+    ------------------
+    see fromfile
+
+    Returns
+    -------
+    GeoArray
+
+    Purpose
+    -------
+    Create GeoArray from a gdal dataset
+    """
+
+    return array(
+        lazy_mask=lazy_mask,
+        **_fromDataset(
+            ds, window=window, bands=bands, bbox=bbox, cellsize=cellsize, scale=scale
+        )
+    )
 
 
-def fromfile(fname):
+def fromfile(fname, lazy_mask=False, bbox=None, window=None, bands=None,
+             cellsize=None, scale=None, mode="r", header_only=False):
     """
     Arguments
     ---------
     fname : str  # file name
+
+    Optional Arguments
+    ------------------
+    lazy_mask : bool                  # defer the mask computation to its first access
+    bbox      : dict                  # read only the cells intersecting the given
+                                      # {"ymin", "ymax", "xmin", "xmax"} bounding box
+    window    : (int, int, int, int)  # read only the given (row, col, nrows, ncols)
+                                      # pixel window
+    bands     : list of int           # read only the given (0-based) bands
+    cellsize  : scalar/2-tuple        # read at the given cellsize
+    scale     : scalar/2-tuple        # read at the given multiple of the file's cellsize,
+                                      # i.e. scale=4 reads every fourth cell
+    mode      : {"r", "r+"}           # access mode, "r+" allows in-place edits
+                                      # of the file, not to be combined with any
+                                      # of the arguments above
+    header_only : bool                # return a GeoInfo instead, see info
     
     Returns
     -------
-    GeoArray
+    GeoArray / GeoInfo
 
     Purpose
     -------
-    Create GeoArray from file
-
+    Create GeoArray from file. Without any of bbox, window, bands, cellsize
+    or scale the returned GeoArray is a virtual memory mapping of the file.
+    Reduced resolution reads use the file's overviews if present.
+    Changes to grids opened in mode "r+" are written to the file by
+    GeoArray.flush or at the end of a with block:
+
+        with ga.fromfile(fname, mode="r+") as grid:
+            grid[..., 100:200, 100:200] = 0
     """
     
-    return array(**_fromFile(fname))
+    if header_only:
+        return info(
+            fname, bbox=bbox, window=window, bands=bands, cellsize=cellsize, scale=scale
+        )
+
+    return array(
+        lazy_mask=lazy_mask,
+        **_fromFile(
+            fname, mode=mode, window=window, bands=bands, bbox=bbox,
+            cellsize=cellsize, scale=scale
+        )
+    )
+
+
+def info(fname, bbox=None, window=None, bands=None, cellsize=None, scale=None):
+    """
+    Arguments
+    ---------
+    fname : str  # file name
+
+    Optional Arguments
+    ------------------
+    see fromfile
+
+    Returns
+    -------
+    GeoInfo
+
+    Purpose
+    -------
+    Return the header, shape, dtype and fill values of the GeoArray
+    fromfile would return, without reading any cell values.
+    """
+
+    return GeoInfo(
+        **_fromFile(
+            fname, window=window, bands=bands, bbox=bbox,
+            cellsize=cellsize, scale=scale, header_only=True
+        )
+    )
+
+
+def fromfiles(fnames, max_workers=4, ordered=True, lazy_mask=False, bbox=None,
+              window=None, bands=None, cellsize=None, scale=None):
+    """
+    Arguments
+    ---------
+    fnames : iterable of str  # file names
+
+    Optional Arguments
+    ------------------
+    max_workers : int   # number of reading threads
+    ordered     : bool  # return the grids in the order of fnames, otherwise
+                        # yield (fname, GeoArray) tuples as the reads complete
+    see fromfile for all other arguments
+
+    Returns
+    -------
+    list of GeoArray / generator of (str, GeoArray)
+
+    Purpose
+    -------
+    Read many files concurrently. GDAL releases the GIL during raster I/O,
+    so latency bound reads (e.g. from network file systems) overlap.
+    Python 2 needs the 'futures' package.
+    """
+
+    if ThreadPoolExecutor is None:
+        raise ImportError("fromfiles needs the module concurrent.futures, see the 'futures' package")
+
+    fnames = list(fnames)
+    kwargs = {
+        "lazy_mask" : lazy_mask,
+        "bbox"      : bbox,
+        "window"    : window,
+        "bands"     : bands,
+        "cellsize"  : cellsize,
+        "scale"     : scale,
+    }
+
+    def _read(fname):
+        return fname, fromfile(fname, **kwargs)
+
+    if ordered:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return [grid for _, grid in executor.map(_read, fnames)]
+    return _iterCompleted(_read, fnames, max_workers)
+
+
+def _iterCompleted(func, fnames, max_workers):
+    # Yield the results of func in the order of their completion, the
+    # pending reads are cancelled if the generator is closed early
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(func, fname) for fname in fnames]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def iterblocks(fname, halo=0, bands=None, lazy_mask=False):
+    """
+    Arguments
+    ---------
+    fname : str  # file name
+
+    Optional Arguments
+    ------------------
+    halo      : int          # number of cells to extend the blocks at each side
+    bands     : list of int  # read only the given (0-based) bands
+    lazy_mask : bool         # defer the mask computation to its first access
+
+    Returns
+    -------
+    generator of GeoArray
+
+    Purpose
+    -------
+    Iterate over the file in blocks of its native block layout. Only one
+    block is read at a time. The blocks are extended by halo cells at each
+    side, truncated at the file's border. The widths of the halo are
+    available as the (top, left, bottom, right) tuple block.halo.
+    """
+
+    for args, halo_widths in _iterBlocks(fname, halo=halo, bands=bands):
+        block = array(lazy_mask=lazy_mask, **args)
+        block._optinfo["halo"] = halo_widths
+        yield block
+
+
+def writeblocks(fname, blocks, like=None, tiled=None, blocksize=None, compress=None,
+                predictor=None, bigtiff=None, num_threads=None):
+    """
+    Arguments
+    ---------
+    fname  : str                  # file name
+    blocks : iterable of GeoArray
+
+    Optional Arguments
+    ------------------
+    like   : str/gdal.Dataset     # template defining the spatial extent and
+                                  # projection of a newly created file
+    tiled, blocksize, compress,   # creation options of a newly created file,
+    predictor, bigtiff,           # see GeoArray.tofile
+    num_threads
+
+    Returns
+    -------
+    None
+
+    Purpose
+    -------
+    Write the given blocks, e.g. as yielded by iterblocks or GeoArray.blocks,
+    into the file fname, removing their halos. The position of each block is
+    derived from its origin. An existing file is updated in place, otherwise
+    it is created from like (only drivers supporting direct writing).
+    """
+
+    _writeBlocks(fname, blocks, like=like, options={
+        "tiled"       : tiled,
+        "blocksize"   : blocksize,
+        "compress"    : compress,
+        "predictor"   : predictor,
+        "bigtiff"     : bigtiff,
+        "num_threads" : num_threads,
+    })
 
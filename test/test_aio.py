@@ -0,0 +1,69 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import shutil
+import unittest
+import tempfile
+import numpy as np
+import geoarray as ga
+from test_utils import testArray
+
+# all tests, run from main directory:
+# python -m unittest discover test
+
+# this test only, run from parent directory run
+# python -m unittest test.test_aio
+
+@unittest.skipIf(sys.version_info < (3, 6), "asyncio API needs Python >= 3.6")
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        import asyncio
+        self.loop = asyncio.new_event_loop()
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.loop.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_afromfile(self):
+        import asyncio
+        fnames, arrays = [], []
+        for i in range(6):
+            fnames.append(os.path.join(self.tmpdir, "file{:}.tif".format(i)))
+            arrays.append(testArray((2, 34, 27)))
+            self.loop.run_until_complete(arrays[-1].atofile(fnames[-1]))
+
+        previous = ga.setAsyncWorkers(2)
+        try:
+            grids = self.loop.run_until_complete(
+                asyncio.gather(*[ga.afromfile(f, window=(0, 0, 34, 27)) for f in fnames])
+            )
+        finally:
+            ga.setAsyncWorkers(previous)
+
+        for grid, test_array in zip(grids, arrays):
+            np.testing.assert_equal(grid.data, test_array.data)
+            self.assertDictEqual(grid.bbox, test_array.bbox)
+
+    def test_aiterblocks(self):
+        fname = os.path.join(self.tmpdir, "file.tif")
+        test_array = testArray((2, 340, 270))
+        test_array.tofile(fname)
+
+        blocks = ga.aiterblocks(fname, halo=1)
+        ncells = 0
+        while True:
+            try:
+                block = self.loop.run_until_complete(blocks.__anext__())
+            except StopAsyncIteration:
+                break
+            top, left, bottom, right = block.halo
+            ncells += (block.nrows - top - bottom) * (block.ncols - left - right)
+        self.assertEqual(ncells, test_array.nrows * test_array.ncols)
+
+
+if __name__== "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import unittest
+import tempfile
+import numpy as np
+import geoarray as ga
+
+# all tests, run from main directory:
+# python -m unittest discover test
+
+# this test only, run from parent directory run
+# python -m unittest test.test_catalog
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.fnames = []
+        for i in range(3):
+            for j in range(4):
+                data = np.full((10, 10), i*10 + j, dtype=np.int16)
+                if (i, j) == (1, 1):
+                    data[:5] = -9
+                grid = ga.array(
+                    data, yorigin=100 - i*10, xorigin=j*10, origin="ul",
+                    cellsize=1, fill_value=-9, proj=9001
+                )
+                fname = os.path.join(self.tmpdir, "tile{:}{:}.tif".format(i, j))
+                grid.tofile(fname)
+                self.fnames.append(fname)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_query(self):
+        catalog = ga.RasterCatalog(self.fnames)
+        self.assertEqual(len(catalog), 12)
+        bbox = {"ymin": 85, "ymax": 95, "xmin": 5, "xmax": 15}
+        found = [os.path.basename(i.fname) for i in catalog.query(bbox)]
+        self.assertListEqual(found, ["tile00.tif", "tile01.tif", "tile10.tif", "tile11.tif"])
+        self.assertListEqual(catalog.query({"ymin": 200, "ymax": 300, "xmin": 0, "xmax": 1}), [])
+
+        fname = os.path.join(self.tmpdir, "index.json")
+        catalog.save(fname)
+        loaded = ga.RasterCatalog.load(fname)
+        self.assertListEqual(
+            [i.fname for i in loaded.query(bbox)], [i.fname for i in catalog.query(bbox)]
+        )
+
+    def test_read(self):
+        catalog = ga.RasterCatalog(self.fnames)
+        grid = catalog.read({"ymin": 83, "ymax": 95, "xmin": 5, "xmax": 15})
+        self.assertTupleEqual(grid.shape, (12, 10))
+        self.assertDictEqual(grid.bbox, {"ymin": 83, "ymax": 95, "xmin": 5, "xmax": 15})
+        self.assertTrue(np.all(grid[:5, :5] == 0))
+        self.assertTrue(np.all(grid[:5, 5:] == 1))
+        self.assertTrue(np.all(grid[5:, :5] == 10))
+        self.assertTrue(np.all(grid.mask[5:10, 5:]))
+        self.assertTrue(np.all(grid[10:, 5:] == 11))
+
+        grid = catalog.read({"ymin": 83, "ymax": 95, "xmin": 5, "xmax": 15}, cellsize=2)
+        self.assertTupleEqual(grid.shape, (6, 5))
+        self.assertTupleEqual(grid.cellsize, (-2, 2))
+        self.assertDictEqual(grid.bbox, {"ymin": 83, "ymax": 95, "xmin": 5, "xmax": 15})
+        self.assertTrue(np.all(grid[:3, :3] == 0))
+        self.assertTrue(np.all(grid[:3, 3:] == 1))
+        self.assertTrue(np.all(grid[3:, :3] == 10))
+        self.assertTrue(np.all(grid[5:, 3:] == 11))
+
+    def test_largeQuery(self):
+        catalog = ga.RasterCatalog(self.fnames)
+        bbox = {"ymin": -1e9, "ymax": 1e9, "xmin": -1e9, "xmax": 1e9}
+        self.assertEqual(len(catalog.query(bbox)), 12)
+
+    def test_bucketsize(self):
+        for bucketsize in (0, -10):
+            self.assertRaises(ValueError, ga.RasterCatalog, self.fnames, bucketsize=bucketsize)
+
+        # files with an empty extent fall back to their cellsize
+        from geoarray.core import GeoInfo
+        catalog = ga.RasterCatalog()
+        catalog._insert(GeoInfo((0, 10), np.dtype("int16"), 100, 0, "ul", (-2, 2), fname="empty.tif"))
+        self.assertEqual(catalog.bucketsize, 20)
+        catalog = ga.RasterCatalog()
+        catalog._insert(GeoInfo((0, 0), np.dtype("int16"), 100, 0, "ul", (-2, 2), fname="empty.tif"))
+        self.assertEqual(catalog.bucketsize, 2)
+        catalog.extend(self.fnames)
+        self.assertEqual(len(catalog.query({"ymin": 85, "ymax": 95, "xmin": 5, "xmax": 15})), 4)
+
+
+if __name__== "__main__":
+    unittest.main()
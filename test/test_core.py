@@ -110,6 +110,26 @@ class Test(unittest.TestCase):
                 break
             break
 
+    def test_getitemBasic(self):
+        grid = ga.ones((3,100,100), yorigin=1000, xorigin=1200, cellsize=10, origin="ul")
+
+        slc = grid[..., 10:20, ::-1]
+        self.assertTupleEqual(slc.getOrigin(), (900, 1200))
+        self.assertTupleEqual(slc.cellsize, (-10, 10))
+
+        slc = grid[np.newaxis, 0, 3:7]
+        self.assertTupleEqual(slc.shape, (1, 4, 100))
+        self.assertTupleEqual(slc.getOrigin(), (970, 1200))
+        self.assertTupleEqual(slc.cellsize, (-10, 10))
+
+        slc = grid[:, 98:2:-3]
+        self.assertTupleEqual(slc.getOrigin(), (950, 1200))
+        self.assertTupleEqual(slc.cellsize, (-30, 10))
+
+        slc = grid[2, -1]
+        self.assertTupleEqual(slc.getOrigin(), (10, 1200))
+        self.assertTupleEqual(slc.cellsize, (-10, 10))
+
     def test_setitem(self):
         for base in self.grids:
             # simplifies the tests...
@@ -176,6 +196,25 @@ class Test(unittest.TestCase):
     #             self.assertTrue(np.all(checkgrid == base))
     #             self.assertDictEqual(checkgrid.bbox, base.bbox)
 
+    def test_checkMatch(self):
+        grid1 = ga.ones((10,10), cellsize=10)
+        grid2 = ga.ones((10,10), cellsize=10, yorigin=5)
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            grid1 + grid2
+            nwarnings = len(w)
+            self.assertGreater(nwarnings, 0)
+            self.assertIn("Incompatible origins", [str(m.message) for m in w])
+            previous = ga.setCheckMatch(False)
+            grid1 + grid2
+            ga.setCheckMatch(previous)
+            self.assertEqual(len(w), nwarnings)
+
+            # the cached signatures follow changes of the origin
+            grid2.yorigin = grid1.yorigin
+            grid1 + grid2
+            self.assertEqual(len(w), nwarnings)
+
     def test_copy(self):
         for base in self.grids[1:]:
             deep_copy = copy.deepcopy(base)
@@ -1,7 +1,10 @@
 #! /usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import os
+import shutil
 import unittest
+import threading
 import tempfile
 import geoarray as ga
 import numpy as np
@@ -28,3 +31,285 @@ class Test(unittest.TestCase):
                 self.assertEqual(check_array.proj, test_array.proj)
                 self.assertEqual(check_array.fill_value, test_array.fill_value)
                 self.assertEqual(check_array.mode, test_array.mode)
+
+    def test_tofileStrided(self):
+        test_array = testArray((3, 340, 270))[..., ::2, ::3]
+        for ending in (".tif", ".img"):
+            with tempfile.NamedTemporaryFile(suffix=ending) as tf:
+                test_array.tofile(tf.name)
+                check_array = ga.fromfile(tf.name)
+                np.testing.assert_equal(check_array.data, test_array.data)
+                self.assertDictEqual(check_array.bbox, test_array.bbox)
+                self.assertEqual(check_array.cellsize, test_array.cellsize)
+
+    def test_creationOptions(self):
+        test_array = testArray((2, 340, 270))
+        with tempfile.NamedTemporaryFile(suffix=".tif") as tf:
+            test_array.tofile(tf.name, blocksize=64, compress="lzw", predictor=2)
+            check_array = ga.fromfile(tf.name)
+            fobj = check_array._fobj
+            self.assertEqual(
+                fobj.GetMetadata("IMAGE_STRUCTURE").get("COMPRESSION"), "LZW"
+            )
+            self.assertListEqual(fobj.GetRasterBand(1).GetBlockSize(), [64, 64])
+            np.testing.assert_equal(check_array.data, test_array.data)
+
+    def test_cog(self):
+        test_array = testArray((2, 340, 270))
+        with tempfile.NamedTemporaryFile(suffix=".tif") as tf:
+            test_array.tocog(tf.name, resampling="average", blocksize=128)
+            check_array = ga.fromfile(tf.name)
+            self.assertGreater(check_array._fobj.GetRasterBand(1).GetOverviewCount(), 0)
+            self.assertListEqual(check_array._fobj.GetRasterBand(1).GetBlockSize(), [128, 128])
+            np.testing.assert_equal(check_array.data, test_array.data)
+            self.assertDictEqual(check_array.bbox, test_array.bbox)
+
+        with tempfile.NamedTemporaryFile(suffix=".img") as tf:
+            self.assertRaises(IOError, test_array.tocog, tf.name)
+
+    def test_window(self):
+        test_array = testArray((3, 340, 270))
+        with tempfile.NamedTemporaryFile(suffix=".tif") as tf:
+            test_array.tofile(tf.name)
+
+            window = (10, 20, 100, 50)
+            check_array = ga.fromfile(tf.name, window=window, bands=[0, 2])
+            expected = test_array[[0, 2], 10:110, 20:70]
+            np.testing.assert_equal(check_array.data, expected.data)
+            self.assertDictEqual(check_array.bbox, test_array[..., 10:110, 20:70].bbox)
+            self.assertIsNone(check_array._fobj)
+
+            for bands in ([], [3], [-1]):
+                self.assertRaises(ValueError, ga.fromfile, tf.name, window=window, bands=bands)
+                self.assertRaises(ValueError, ga.info, tf.name, bands=bands)
+
+            bbox = test_array[..., 10:110, 20:70].bbox
+            check_array = ga.fromfile(tf.name, bbox=bbox)
+            np.testing.assert_equal(check_array.data, test_array[..., 10:110, 20:70].data)
+            self.assertDictEqual(check_array.bbox, bbox)
+
+    def test_scale(self):
+        test_array = testArray((2, 340, 270))
+        with tempfile.NamedTemporaryFile(suffix=".tif") as tf:
+            test_array.tofile(tf.name)
+
+            check_array = ga.fromfile(tf.name, scale=2)
+            self.assertTupleEqual(check_array.shape, (2, 170, 135))
+            self.assertTupleEqual(
+                check_array.cellsize,
+                tuple(cs * 2 for cs in test_array.cellsize)
+            )
+            self.assertDictEqual(check_array.bbox, test_array.bbox)
+
+            check_array = ga.fromfile(tf.name, cellsize=10000, window=(0, 0, 100, 100))
+            self.assertTupleEqual(check_array.shape, (2, 10, 10))
+            self.assertTupleEqual(check_array.getOrigin(), test_array.getOrigin())
+
+    def test_update(self):
+        test_array = testArray((2, 34, 27))
+        with tempfile.NamedTemporaryFile(suffix=".tif") as tf:
+            test_array.tofile(tf.name)
+            with ga.fromfile(tf.name, mode="r+") as grid:
+                grid[..., 10:20, 5:15] = 0
+                grid[0, 0, 0] = np.ma.masked
+            check_array = ga.fromfile(tf.name, window=(0, 0, 34, 27))
+            test_array[..., 10:20, 5:15] = 0
+            test_array[0, 0, 0] = test_array.fill_value
+            np.testing.assert_equal(check_array.data, test_array.data)
+            self.assertTrue(check_array.mask[0, 0, 0])
+            self.assertRaises(TypeError, ga.fromfile, tf.name, window=(0, 0, 5, 5), mode="r+")
+
+    def test_dirtyBlocks(self):
+        test_array = testArray((2, 600, 500))
+        with tempfile.NamedTemporaryFile(suffix=".tif") as tf:
+            test_array.tofile(tf.name, blocksize=256)
+            grid = ga.fromfile(tf.name, mode="r+")
+            grid[..., 300:310, 20:30] = 0
+            grid[1, 599, 499] = 1
+            self.assertListEqual(
+                grid._dirtyWindows(), [(256, 0, 256, 256), (512, 256, 88, 244)]
+            )
+            grid.tofile(tf.name)
+            self.assertFalse(grid._dirty)
+
+            check_array = ga.fromfile(tf.name, window=(0, 0, 600, 500))
+            test_array[..., 300:310, 20:30] = 0
+            test_array[1, 599, 499] = 1
+            np.testing.assert_equal(check_array.data, test_array.data)
+
+    def test_untrackedWrites(self):
+        test_array = testArray((2, 600, 500))
+        with tempfile.NamedTemporaryFile(suffix=".tif") as tf:
+            test_array.tofile(tf.name, blocksize=256)
+            grid = ga.fromfile(tf.name, mode="r+")
+
+            # views share the record of modified blocks
+            view = grid[..., 300:310, 20:30]
+            view[...] = 0
+            next(grid.blocks())[:, 5, 5] = 1
+            np.add(view, 1, out=view)
+            self.assertListEqual(grid._dirtyWindows(), [(0, 0, 256, 256), (256, 0, 256, 256)])
+            grid.flush()
+            test_array[..., 300:310, 20:30] = 1
+            test_array[:, 5, 5] = 1
+            check_array = ga.fromfile(tf.name, window=(0, 0, 600, 500))
+            np.testing.assert_equal(check_array.data, test_array.data)
+
+            # writes through the data attribute or numpy functions
+            grid.data[1, 599, 499] = 2
+            np.copyto(grid[..., 0:10, 400:410], 3)
+            grid.flush()
+            test_array[1, 599, 499] = 2
+            test_array[..., 0:10, 400:410] = 3
+            check_array = ga.fromfile(tf.name, window=(0, 0, 600, 500))
+            np.testing.assert_equal(check_array.data, test_array.data)
+
+            # plain arrays need a full flush
+            np.asarray(grid)[0, 590, 10] = 4
+            grid.flush(full=True)
+            test_array[0, 590, 10] = 4
+            check_array = ga.fromfile(tf.name, window=(0, 0, 600, 500))
+            np.testing.assert_equal(check_array.data, test_array.data)
+
+    def test_derivedGrids(self):
+        test_array = testArray((2, 34, 27))
+        with tempfile.NamedTemporaryFile(suffix=".tif") as tf:
+            test_array.tofile(tf.name)
+            grid = ga.fromfile(tf.name, mode="r+")
+
+            # copies are not backed by the file
+            copied = grid.copy()
+            copied[..., 0:2, 0:2] = 0
+            self.assertIsNone(copied._dirty)
+            copied.flush()
+            self.assertFalse(grid._dirty)
+            check_array = ga.fromfile(tf.name, window=(0, 0, 34, 27))
+            np.testing.assert_equal(check_array.data, test_array.data)
+
+            # neither are the results of operators
+            doubled = grid * 2
+            del grid, copied
+            doubled.tofile(tf.name)
+            check_array = ga.fromfile(tf.name, window=(0, 0, 34, 27))
+            np.testing.assert_equal(check_array.data, doubled.data)
+
+    def test_pool(self):
+        from geoarray.gdalio import _DATASETS
+        test_array = testArray((2, 34, 27))
+        with tempfile.NamedTemporaryFile(suffix=".tif") as tf:
+            test_array.tofile(tf.name)
+            fobj = _DATASETS.open(tf.name)
+            self.assertIs(_DATASETS.open(tf.name), fobj)
+            self.assertIsNot(_DATASETS.open(tf.name, "r+"), fobj)
+
+            # handles are not shared between threads
+            handles = []
+            thread = threading.Thread(target=lambda: handles.append(_DATASETS.open(tf.name)))
+            thread.start()
+            thread.join()
+            self.assertIsNot(handles[0], fobj)
+
+            # mapped grids get their own handles
+            grid = ga.fromfile(tf.name)
+            self.assertIsNot(grid._fobj, fobj)
+            self.assertIsNot(ga.fromfile(tf.name)._fobj, grid._fobj)
+
+            previous = ga.setPoolSize(0)
+            try:
+                self.assertIsNot(_DATASETS.open(tf.name), fobj)
+            finally:
+                ga.setPoolSize(previous)
+
+            # rewriting a mapped file keeps the mapped content
+            (test_array + 1).tofile(tf.name)
+            np.testing.assert_equal(ga.fromfile(tf.name).data, test_array.data + 1)
+            np.testing.assert_equal(grid.data, test_array.data)
+
+            # files mapped for writing are not replaced
+            updated = ga.fromfile(tf.name, mode="r+")
+            self.assertRaises(IOError, test_array.tofile, tf.name)
+            np.testing.assert_equal(updated.data, test_array.data + 1)
+
+    def test_fromfiles(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            fnames, arrays = [], []
+            for i in range(5):
+                fnames.append(os.path.join(tmpdir, "file{:}.tif".format(i)))
+                arrays.append(testArray((2, 34, 27)))
+                arrays[-1].tofile(fnames[-1])
+
+            grids = ga.fromfiles(fnames, max_workers=3, window=(2, 3, 10, 10))
+            for grid, test_array in zip(grids, arrays):
+                np.testing.assert_equal(grid.data, test_array[..., 2:12, 3:13].data)
+
+            expected = dict(zip(fnames, arrays))
+            completed = ga.fromfiles(fnames, max_workers=3, ordered=False)
+            for fname, grid in completed:
+                np.testing.assert_equal(grid.data, expected.pop(fname).data)
+            self.assertFalse(expected)
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_info(self):
+        test_array = testArray((3, 34, 27))
+        with tempfile.NamedTemporaryFile(suffix=".tif") as tf:
+            test_array.tofile(tf.name)
+            info = ga.info(tf.name)
+            self.assertTupleEqual(info.shape, test_array.shape)
+            self.assertEqual(info.dtype, test_array.dtype)
+            self.assertEqual(info.nbands, 3)
+            self.assertTupleEqual(info.fill_values, (test_array.fill_value,) * 3)
+            self.assertDictEqual(info.bbox, test_array.bbox)
+            self.assertDictEqual(info.header, ga.fromfile(tf.name).header)
+
+            info = ga.fromfile(tf.name, header_only=True, window=(2, 3, 10, 10), bands=[1])
+            grid = ga.fromfile(tf.name, window=(2, 3, 10, 10), bands=[1])
+            self.assertTupleEqual(info.shape, grid.shape)
+            self.assertDictEqual(info.bbox, grid.bbox)
+
+    def test_memDataset(self):
+        from geoarray.gdalio import _getDataset
+        test_array = testArray((2, 34, 27))
+        dataset = _getDataset(test_array, mem=True)
+        test_array[1, 3, 4] = 42
+        self.assertEqual(dataset.GetRasterBand(2).ReadAsArray()[3, 4], 42)
+
+        # non contiguous grids are copied
+        strided = test_array[..., ::-1, :]
+        dataset = _getDataset(strided, mem=True)
+        np.testing.assert_equal(dataset.ReadAsArray(), strided.data)
+        strided[0, 0, 0] = 43
+        self.assertNotEqual(dataset.ReadAsArray()[0, 0, 0], 43)
+
+        # shared memory outlives the grid
+        grid = testArray((2, 34, 27))
+        expected = grid.data.copy()
+        dataset = _getDataset(grid, mem=True)
+        del grid
+        np.testing.assert_equal(dataset.ReadAsArray(), expected)
+
+    def test_blocks(self):
+        test_array = testArray((2, 340, 270))
+        with tempfile.NamedTemporaryFile(suffix=".tif") as tf:
+            test_array.tofile(tf.name)
+            tmpdir = tempfile.mkdtemp()
+            try:
+                fname = os.path.join(tmpdir, "out.tif")
+                blocks = ga.iterblocks(tf.name, halo=2)
+                ga.writeblocks(fname, (b + 1 for b in blocks), like=tf.name)
+                check_array = ga.fromfile(fname)
+                np.testing.assert_equal(check_array.data, test_array.data + 1)
+                self.assertDictEqual(check_array.bbox, test_array.bbox)
+            finally:
+                shutil.rmtree(tmpdir)
+
+        ncells = 0
+        for block in test_array.blocks(blocksize=(100, 100), halo=1):
+            top, left, bottom, right = block.halo
+            ncells += (block.nrows - top - bottom) * (block.ncols - left - right)
+        self.assertEqual(ncells, test_array.nrows * test_array.ncols)
+
+        # in-memory datasets do not define the block layout
+        test_array.fobj
+        self.assertEqual(next(test_array.blocks()).shape[-2:], (256, 256))
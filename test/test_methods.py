@@ -176,6 +176,178 @@ class Test(unittest.TestCase):
             for c, e in zip(coodinates, expected):
                 self.assertTupleEqual(base.indexOf(*c), e)
 
+    def test_indexOfArray(self):
+        for base in self.grids:
+            bbox = base.bbox
+            cellsize = np.abs(base.cellsize)
+            ycoors = np.linspace(bbox["ymin"]+cellsize[0]*.5, bbox["ymax"], 17)
+            xcoors = np.linspace(bbox["xmin"], bbox["xmax"]-cellsize[1]*.5, 17)
+
+            yidx, xidx = base.indexOf(ycoors, xcoors)
+            for y, x, yi, xi in zip(ycoors, xcoors, yidx, xidx):
+                self.assertTupleEqual(base.indexOf(y, x), (yi, xi))
+
+            ycoords, xcoords = base.coordinatesOf(yidx, xidx)
+            for yi, xi, y, x in zip(yidx, xidx, ycoords, xcoords):
+                self.assertTupleEqual(base.coordinatesOf(yi, xi), (y, x))
+
+            ycoors = np.array([bbox["ymax"], bbox["ymax"] + cellsize[0]])
+            xcoors = np.array([bbox["xmin"], bbox["xmin"]])
+            self.assertRaises(ValueError, base.indexOf, ycoors, xcoors)
+            yidx, xidx = base.indexOf(ycoors, xcoors, bounds="mask")
+            self.assertListEqual(yidx.mask.tolist(), [False, True])
+            yidx, xidx = base.indexOf(ycoors, xcoors, bounds="clip")
+            self.assertListEqual(yidx.tolist(), [0, 0])
+
+    def test_sample(self):
+        for base in self.grids:
+            cellsize = np.abs(base.cellsize)
+            yidx = np.random.randint(0, base.nrows, 100)
+            xidx = np.random.randint(0, base.ncols, 100)
+            ycoors, xcoors = base.coordinatesOf(yidx, xidx)
+            # cell centers
+            ycoors, xcoors = ycoors - cellsize[0]/2., xcoors + cellsize[1]/2.
+
+            expected = base[..., yidx, xidx]
+            for method in ("nearest", "bilinear", "cubic"):
+                values = base.sample(ycoors, xcoors, method=method)
+                self.assertTupleEqual(values.shape, base.shape[:-2] + (100,))
+                np.testing.assert_allclose(
+                    values[~values.mask], expected[~values.mask], rtol=1e-6
+                )
+
+            bbox = base.bbox
+            values = base.sample(bbox["ymax"] + cellsize[0], bbox["xmin"], method="bilinear")
+            self.assertTrue(np.all(values.mask))
+
+    def test_projectThreads(self):
+        for base in self.grids:
+            if not base.proj:
+                continue
+            proj = {"init": "epsg:3857"}
+            single = ga.project(base, proj=proj, max_error=0)
+            multi = ga.project(
+                base, proj=proj, max_error=0,
+                num_threads=2, warp_memory_limit=16, chunked=True
+            )
+            np.testing.assert_equal(single.data, multi.data)
+            self.assertDictEqual(single.bbox, multi.bbox)
+
+    def test_warpPlan(self):
+        for base in self.grids:
+            if base.fill_value is None:
+                continue
+            target = ga.full(
+                (base.nrows//2, base.ncols//2), base.fill_value,
+                yorigin=base.getOrigin("ul")[0], xorigin=base.getOrigin("ul")[1], origin="ul",
+                cellsize=(-abs(base.cellsize[0])*2, abs(base.cellsize[1])*2), proj=base.proj
+            )
+            for func in ("nearest", "bilinear", "cubic", "average"):
+                plan = ga.WarpPlan(base, target, func)
+                out = plan(base)
+                self.assertTupleEqual(out.shape, base.shape[:-2] + target.shape)
+                self.assertDictEqual(out.bbox, target.bbox)
+                # plans are reusable
+                np.testing.assert_equal(plan(base).data, out.data)
+
+            same = ga.WarpPlan(base, base, "nearest")(base)
+            self.assertTrue(np.all(same == base))
+            self.assertRaises(ValueError, plan, base[..., 1:, :])
+
+    def test_warpPlanValues(self):
+        for base in self.grids:
+            if base.fill_value is None:
+                continue
+            grid = ga.array(np.random.uniform(0, 100, base.shape), **base.header)
+            cellsize = np.abs(grid.cellsize)
+            yorigin, xorigin = grid.getOrigin("ul")
+
+            # shifted by a quarter cell and away from the borders, i.e.
+            # pure interpolation without any of GDAL's edge handling
+            shifted = ga.full(
+                (grid.nrows - 4, grid.ncols - 4), grid.fill_value,
+                yorigin=yorigin - 1.25*cellsize[0], xorigin=xorigin + 1.25*cellsize[1],
+                origin="ul", cellsize=(-cellsize[0], cellsize[1]), proj=grid.proj
+            )
+            for func in ("nearest", "bilinear", "cubic"):
+                np.testing.assert_allclose(
+                    ga.WarpPlan(grid, shifted, func)(grid).data,
+                    ga.resample(grid, shifted, func).data,
+                    rtol=1e-6
+                )
+
+            coarse = ga.full(
+                (grid.nrows//2, grid.ncols//2), grid.fill_value,
+                yorigin=yorigin, xorigin=xorigin, origin="ul",
+                cellsize=(-cellsize[0]*2, cellsize[1]*2), proj=grid.proj
+            )
+            np.testing.assert_allclose(
+                ga.WarpPlan(grid, coarse, "average")(grid).data,
+                ga.resample(grid, coarse, "average").data,
+                rtol=1e-6
+            )
+
+    def test_warpPlanProjection(self):
+        # grids without a projection are not transformed
+        grid = ga.array(np.arange(12.).reshape(3, 4), yorigin=3, cellsize=1, fill_value=-1)
+        target = ga.full((3, 4), -1., yorigin=3, cellsize=1, proj=3857)
+        out = ga.WarpPlan(grid, target)(grid)
+        np.testing.assert_equal(out.data, grid.data)
+
+    def test_rescaleBlocks(self):
+        data = np.arange(2*7*9).reshape(2, 7, 9) % 5
+        data[0, :3, :3] = -9
+        grid = ga.array(data, yorigin=100, xorigin=200, origin="ll", cellsize=10, fill_value=-9)
+        blocks = np.ma.masked_equal(data[:, :6, :9], -9).reshape(2, 2, 3, 3, 3)
+
+        expected = {
+            "mean"  : blocks.mean(axis=(2, 4)),
+            "sum"   : blocks.sum(axis=(2, 4)),
+            "min"   : blocks.min(axis=(2, 4)),
+            "max"   : blocks.max(axis=(2, 4)),
+            "count" : blocks.count(axis=(2, 4)),
+        }
+        for func, exp in expected.items():
+            out = ga.rescale(grid, 3, func)
+            self.assertTupleEqual(out.shape, (2, 2, 3))
+            self.assertTupleEqual(out.cellsize, (30, 30))
+            self.assertDictEqual(out.bbox, grid[..., :6, :].bbox)
+            np.testing.assert_allclose(np.ma.filled(out, -9), np.ma.filled(exp, -9))
+
+        out = ga.rescale(grid, 3, "mode")
+        self.assertTrue(out.mask[0, 0, 0])
+        self.assertEqual(out[1, 1, 2], np.argmax(np.bincount(blocks[1, 1, :, 2].ravel())))
+        self.assertRaises(TypeError, ga.rescale, grid, 2.5, "sum")
+
+    def test_upsample(self):
+        data = np.arange(2*3*4).reshape(2, 3, 4)
+        data[0, 0, 0] = -9
+        grid = ga.array(data, yorigin=100, xorigin=200, origin="ll", cellsize=10, fill_value=-9)
+
+        fine = ga.upsample(grid, 5)
+        self.assertTupleEqual(fine.shape, (2, 15, 20))
+        self.assertTupleEqual(fine.cellsize, (2, 2))
+        self.assertDictEqual(fine.bbox, grid.bbox)
+        self.assertTrue(np.all(fine[..., ::5, ::5] == grid))
+        self.assertEqual(fine.mask.sum(), 25)
+        np.testing.assert_equal(ga.rescale(grid, .2).data, fine.data)
+
+        view, header = ga.upsample(grid, 5, view=True)
+        self.assertTupleEqual(view.shape, (2, 3, 5, 4, 5))
+        self.assertTrue(np.shares_memory(view.data, grid.data))
+        self.assertDictEqual(header, fine.header)
+        check = ga.array(view.reshape(fine.shape), **header)
+        np.testing.assert_equal(check.data, fine.data)
+        self.assertDictEqual(check.bbox, fine.bbox)
+        self.assertRaises(ValueError, view.__setitem__, (0, 0, 0, 0, 0), 1)
+
+        out = ga.combine(fine, grid, np.add)
+        np.testing.assert_equal(out.data, (fine + fine).data)
+        np.testing.assert_equal(out.mask, fine.mask)
+        self.assertDictEqual(out.bbox, fine.bbox)
+        self.assertRaises(ValueError, ga.combine, fine[..., 1:, :], grid, np.add)
+        self.assertRaises(ValueError, ga.combine, grid, fine, np.add)
+
     def test_project(self):
 
         """
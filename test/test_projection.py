@@ -20,3 +20,26 @@ class Test(unittest.TestCase):
                 ga.ones((200,300), proj=4444) # invalid epsg code 
                 self.assertEqual(str(w[0].message), "Projection not understood")
                 self.assertEqual(w[0].category, RuntimeWarning)
+
+    def test_fingerprint(self):
+        g1 = ga.ones((200,300), proj=3857)
+        g2 = ga.ones((200,300), proj=3857)
+        self.assertEqual(g1._proj.fingerprint, g2._proj.fingerprint)
+        g2.proj = 4326
+        self.assertNotEqual(g1._proj.fingerprint, g2._proj.fingerprint)
+
+    def test_registry(self):
+        g1 = ga.ones((200,300), proj=3857)
+        g2 = ga.ones((200,300), proj=g1.proj)
+        self.assertIs(g1._proj._srs, g2._proj._srs)
+        self.assertIs(g1[10:20]._proj._srs, g1._proj._srs)
+        self.assertEqual(g1._proj, g2._proj)
+
+    def test_transform(self):
+        ycoors = np.linspace(5000000, 6000000, 12).reshape(3, 4)
+        xcoors = np.linspace(300000, 900000, 12).reshape(3, 4)
+        sproj, tproj = 3857, 4326
+        ytrans, xtrans = ga.transform(ycoors, xcoors, sproj, tproj)
+        self.assertTupleEqual(ytrans.shape, ycoors.shape)
+        for y, x, yt, xt in zip(ycoors.ravel(), xcoors.ravel(), ytrans.ravel(), xtrans.ravel()):
+            np.testing.assert_almost_equal(ga.transform(y, x, sproj, tproj), (yt, xt))
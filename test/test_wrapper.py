@@ -59,7 +59,20 @@ class Test(unittest.TestCase):
         fill_value = 42
         grid = ga.empty(shape,fill_value=fill_value)
         self.assertEqual(grid.shape, shape)
-              
+
+    def test_lazyMask(self):
+        data = np.arange(48).reshape(2,4,6)
+        fill_value = 10
+        eager = ga.array(data, fill_value=fill_value)
+        lazy = ga.array(data, fill_value=fill_value, lazy_mask=True)
+        self.assertIs(lazy[1, :2, :].mask, np.ma.nomask)
+        self.assertIs(lazy[0, 1, 4], np.ma.masked)
+        self.assertTrue(np.all(lazy.mask == eager.mask))
+        self.assertTrue(lazy[0].lazy_mask)
+
+        grid = ga.zeros((4,6), fill_value=fill_value, lazy_mask=True)
+        self.assertIs(grid.mask, np.ma.nomask)
+
 
 if __name__== "__main__":
     unittest.main()